@@ -127,6 +127,28 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'ModelGrader.sqlite3',
+        # A file rather than the in-memory default, so tests that write from several
+        # threads wait on SQLite's lock like the server does instead of failing
+        'TEST': {
+            'NAME': BASE_DIR / 'test_ModelGrader.sqlite3',
+        },
+    }
+}
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# Tokens, permissions and testcases are invalidated by writing to the cache, so every
+# worker must share it: files on this node by default, set CACHE_BACKEND/CACHE_LOCATION
+# to memcached or redis for several nodes. A per-process LocMemCache is not used for them.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND',default='api.caches.backends.AtomicFileBasedCache'),
+        'LOCATION': config('CACHE_LOCATION',default=os.path.join(BASE_DIR,'api','caches','files')),
+        'OPTIONS': {
+            # Per-account entries (tokens, permissions) for every active account
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRIES',default=20000,cast=int),
+        },
     }
 }
 
@@ -185,3 +207,35 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+
+# Grader
+# Number of sandbox sections (concurrent gradings) per sandbox directory
+GRADER_SECTIONS = config('GRADER_SECTIONS',default=os.cpu_count() or 1,cast=int)
+# Lock files of the sections, every worker of the node must use the same directory
+GRADER_LOCK_DIR = config('GRADER_LOCK_DIR',default=os.path.join(BASE_DIR,'api','sandbox','locks'))
+# Testcases of one program run in parallel (per-submission cap), so a grading
+# node runs at most GRADER_SECTIONS * GRADER_TESTCASE_CONCURRENCY programs.
+GRADER_TESTCASE_CONCURRENCY = config('GRADER_TESTCASE_CONCURRENCY',default=1,cast=int)
+# Compiled C/C++ binaries keyed by source hash, least recently used evicted past the size (bytes)
+GRADER_COMPILE_CACHE_DIR = config('GRADER_COMPILE_CACHE_DIR',default=os.path.join(BASE_DIR,'api','sandbox','cache'))
+GRADER_COMPILE_CACHE_SIZE = config('GRADER_COMPILE_CACHE_SIZE',default=512*1024*1024,cast=int)
+# Limits of one compilation: seconds, address space of each compiler process and size of a written file (bytes)
+GRADER_COMPILE_TIMEOUT = config('GRADER_COMPILE_TIMEOUT',default=10,cast=float)
+GRADER_COMPILE_MEMORY_LIMIT = config('GRADER_COMPILE_MEMORY_LIMIT',default=1024*1024*1024,cast=int)
+GRADER_COMPILE_WRITE_LIMIT = config('GRADER_COMPILE_WRITE_LIMIT',default=64*1024*1024,cast=int)
+# Run Python testcases in children forked from a warm interpreter instead of a new `python` each
+GRADER_PYTHON_FORKSERVER = config('GRADER_PYTHON_FORKSERVER',default=False,cast=bool)
+# Seconds a submission event stream stays open before it ends with a timeout event. Each open
+# stream holds a web worker (thread) and polls the database, so keep it short unless the
+# server runs threaded/async workers. Polling GET submissions/<id> is the supported path.
+GRADER_STREAM_TIMEOUT = config('GRADER_STREAM_TIMEOUT',default=15,cast=float)
+# `manage.py fail_stale_submissions` (run by entrypoint.sh before the server starts) marks
+# asynchronous submissions PENDING/GRADING for longer than this (seconds) as ERROR, their jobs
+# were lost with the previous server. Raise it when several nodes share the database.
+GRADER_STALE_SUBMISSION_AGE = config('GRADER_STALE_SUBMISSION_AGE',default=0,cast=float)
+
+# Difficulty
+# Seconds a problem's difficulty recompute waits after a submission, submissions in between share it (0 = inline)
+DIFFICULTY_UPDATE_DELAY = config('DIFFICULTY_UPDATE_DELAY',default=30,cast=float)
+# Model of difficulty_predictor.predictor, loaded once per process on first use
+DIFFICULTY_MODEL_PATH = config('DIFFICULTY_MODEL_PATH',default=os.path.join(BASE_DIR,'api','difficulty_predictor','difficulty_predictor_667.sav'))
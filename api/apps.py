@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_save,post_delete
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from .models import GroupMember,TopicGroupPermission,CollectionGroupPermission,ProblemGroupPermission
+        from .permissions.effective import invalidate_effective_permissions
+        for model in [GroupMember,TopicGroupPermission,CollectionGroupPermission,ProblemGroupPermission]:
+            post_save.connect(invalidate_effective_permissions,sender=model,dispatch_uid=f'effective_permissions_save_{model.__name__}')
+            post_delete.connect(invalidate_effective_permissions,sender=model,dispatch_uid=f'effective_permissions_delete_{model.__name__}')
@@ -0,0 +1,55 @@
+from hmac import compare_digest
+from time import time
+from rest_framework import authentication,exceptions
+from .models import Account
+from .caches.tokens import get_account_token
+
+def is_valid_token(account_id:str,token:str) -> bool:
+    try:
+        account_token,token_expire = get_account_token(account_id)
+    except Account.DoesNotExist:
+        return False
+    if not account_token or not token or token_expire is None:
+        return False
+    # Bytes, compare_digest raises TypeError on non-ASCII str
+    return token_expire >= time() and compare_digest(account_token.encode(),str(token).encode())
+
+class AuthenticatedAccount:
+    """request.user of a token authenticated request, the Account row is loaded on first use"""
+    is_authenticated = True
+
+    def __init__(self,account_id:str) -> None:
+        self.account_id = account_id
+        self._account = None
+
+    @property
+    def account(self) -> Account:
+        if self._account is None:
+            self._account = Account.objects.get(account_id=self.account_id)
+        return self._account
+
+class AccountTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Authorization: Token <account_id>:<token>
+
+    Add to a view with @authentication_classes([AccountTokenAuthentication]),
+    a valid token costs no query while it is cached.
+    """
+    keyword = 'Token'
+
+    def authenticate(self,request):
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed("Invalid token header!")
+        try:
+            account_id,token = auth[1].decode().split(':',1)
+        except (UnicodeError,ValueError):
+            raise exceptions.AuthenticationFailed("Invalid token header!")
+        if not is_valid_token(account_id,token):
+            raise exceptions.AuthenticationFailed("Invalid token!")
+        return (AuthenticatedAccount(account_id),token)
+
+    def authenticate_header(self,request):
+        return self.keyword
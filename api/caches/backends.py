@@ -0,0 +1,29 @@
+import os
+import tempfile
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+
+class AtomicFileBasedCache(FileBasedCache):
+    """
+    FileBasedCache whose add() is atomic across processes.
+
+    Django's add() checks has_key() and then calls set(), so a set() made in
+    between is overwritten. Here the entry is written to a temporary file and
+    hard linked into place, which fails when the entry already exists. An
+    expired entry makes add() return False until a get() removes it.
+    """
+
+    def add(self,key,value,timeout=DEFAULT_TIMEOUT,version=None):
+        self._createdir()
+        fname = self._key_to_file(key,version)
+        self._cull()
+        fd,tmp_path = tempfile.mkstemp(dir=self._dir)
+        try:
+            with open(fd,'wb') as f:
+                self._write_content(f,timeout,value)
+            os.link(tmp_path,fname)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(tmp_path)
@@ -0,0 +1,10 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+def is_shared_cache() -> bool:
+    """
+    False when the default cache lives in this process only. Invalidations
+    written there are never seen by the other workers, so the caches in
+    this package read the database instead.
+    """
+    return not isinstance(caches['default'],LocMemCache)
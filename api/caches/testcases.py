@@ -0,0 +1,43 @@
+from django.core.cache import cache
+from ..models import Testcase,generate_uuid4_hex
+from .shared import is_shared_cache
+
+"""
+Active testcases of a problem, cached for the submit path.
+
+Entries are keyed by a per-problem version. Invalidating replaces the
+version, so readers that raced with an update only ever fill a key
+nobody asks for again. A version that was evicted is replaced by a
+fresh one, never by an older one.
+"""
+
+TIMEOUT = 60*60 # (Second)
+
+def version_key(problem_id:str) -> str:
+    return f'testcases-version:{problem_id}'
+
+def get_version(problem_id:str) -> str:
+    version = cache.get(version_key(problem_id))
+    if version is None:
+        cache.add(version_key(problem_id),generate_uuid4_hex(),None)
+        version = cache.get(version_key(problem_id))
+    return version
+
+def load_problem_testcases(problem_id:str) -> tuple[list[str],list[str],list[str]]:
+    rows = list(Testcase.objects.filter(problem_id=problem_id,deprecated=False).values_list('testcase_id','input','output'))
+    return [i[0] for i in rows],[i[1] for i in rows],[i[2] for i in rows]
+
+def get_problem_testcases(problem_id:str) -> tuple[list[str],list[str],list[str]]:
+    """(testcase_ids,inputs,outputs) of the problem's non deprecated testcases"""
+    if not is_shared_cache():
+        return load_problem_testcases(problem_id)
+    key = f'testcases:{problem_id}:{get_version(problem_id)}'
+    testcases = cache.get(key)
+    if testcases is None:
+        testcases = load_problem_testcases(problem_id)
+        cache.set(key,testcases,TIMEOUT)
+    return testcases
+
+def invalidate_problem_testcases(problem_id:str) -> None:
+    """Call after the problem's testcases were changed in the database"""
+    cache.set(version_key(problem_id),generate_uuid4_hex(),None)
@@ -0,0 +1,42 @@
+from time import time
+from django.core.cache import cache
+from ..models import Account
+from .shared import is_shared_cache
+
+"""
+Login token of each account, cached for the authorization hot path.
+
+Entries hold (token,token_expire) and live until the token expires or
+TIMEOUT passes. Login, logout and password changes overwrite the entry
+with the saved row; a reader that loaded the row before such a write
+only fills an empty entry (cache.add), so it cannot put the old token back.
+That needs an atomic add(): memcached, redis and the default
+AtomicFileBasedCache have one, Django's plain FileBasedCache does not.
+"""
+
+TIMEOUT = 60*60 # (Second)
+
+def token_key(account_id:str) -> str:
+    return f'token:{account_id}'
+
+def token_timeout(token_expire:int) -> int:
+    if token_expire is None:
+        return TIMEOUT
+    return max(1,min(TIMEOUT,int(token_expire-time())))
+
+def get_account_token(account_id:str) -> tuple[str,int]:
+    """(token,token_expire) of the account, raises Account.DoesNotExist"""
+    if not is_shared_cache():
+        # A logout on another worker would not reach this cache
+        return Account.objects.values_list('token','token_expire').get(account_id=account_id)
+    entry = cache.get(token_key(account_id))
+    if entry is None:
+        entry = Account.objects.values_list('token','token_expire').get(account_id=account_id)
+        cache.add(token_key(account_id),entry,token_timeout(entry[1]))
+    return entry
+
+def cache_account_token(account:Account) -> None:
+    """Call after the account's token or password was saved"""
+    if not is_shared_cache():
+        return
+    cache.set(token_key(account.account_id),(account.token,account.token_expire),token_timeout(account.token_expire))
@@ -0,0 +1,50 @@
+from rest_framework.response import Response
+from ...models import *
+from rest_framework import status
+from ...serializers import *
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+def parse_day(value:str):
+    """YYYY-MM-DD to a date, None for no value, ValueError for anything else"""
+    if not value:
+        return None
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(value)
+    return day
+
+def get_daily_submission(account_id:str,request):
+    # Optional inclusive range of days, counts=1 leaves out the submissions
+    try:
+        start = parse_day(request.query_params.get("start",""))
+        end = parse_day(request.query_params.get("end",""))
+    except ValueError:
+        return Response({'message':"Invalid date, expected YYYY-MM-DD!"},status=status.HTTP_400_BAD_REQUEST)
+    counts_only = int(request.query_params.get("counts",0))
+
+    submission_by_date = {}
+
+    if counts_only:
+        # Served from the rollup, one row per active day
+        counts = DailySubmissionCount.objects.filter(account_id=account_id)
+        if start: counts = counts.filter(date__gte=start)
+        if end: counts = counts.filter(date__lte=end)
+        for date,count in counts.order_by('date').values_list('date','count'):
+            submission_by_date[date.isoformat()] = {"count": count}
+        return Response({"submissions_by_date": submission_by_date})
+
+    submissions = Submission.objects.filter(account_id=account_id)
+    if start: submissions = submissions.filter(date__date__gte=start)
+    if end: submissions = submissions.filter(date__date__lte=end)
+    submissions = list(submissions.order_by('date'))
+    serializes = SubmissionSerializer(submissions,many=True)
+
+    for submission,data in zip(submissions,serializes.data):
+        date = timezone.localdate(submission.date).isoformat()
+        if date not in submission_by_date:
+            submission_by_date[date] = {"count": 0,"submissions": []}
+        submission_by_date[date]["submissions"].append(data)
+        submission_by_date[date]["count"] += 1
+
+    return Response({"submissions_by_date": submission_by_date})
@@ -0,0 +1,17 @@
+from django.db import transaction,IntegrityError
+from django.db.models import F
+from django.utils import timezone
+from ...models import *
+
+def record_daily_submission(submission:Submission):
+    """Count a new submission in its account's DailySubmissionCount"""
+    date = timezone.localdate(submission.date)
+    counts = DailySubmissionCount.objects.filter(account_id=submission.account_id,date=date)
+    if counts.update(count=F('count')+1):
+        return
+    try:
+        with transaction.atomic():
+            DailySubmissionCount.objects.create(account_id=submission.account_id,date=date,count=1)
+    except IntegrityError:
+        # Another submission of the same day created the row first
+        counts.update(count=F('count')+1)
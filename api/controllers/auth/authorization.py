@@ -7,15 +7,8 @@ from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
 from ...serializers import *
-from time import time
+from ...authentication import is_valid_token
 
 def authorization(request):
-    try:
-        account = Account.objects.get(account_id=request.data['account_id'])
-        account_dict = model_to_dict(account)
-        if account_dict['token_expire'] >= time() and account_dict['token'] == request.data['token']:
-            return Response({'result':True},status=status.HTTP_200_OK)
-        return Response({'result':False},status=status.HTTP_200_OK)
-    except Account.DoesNotExist:
-        return Response({'result':False},status=status.HTTP_200_OK)
-        # return Response({'message':"User doesn't exists!"},status=status.HTTP_404_NOT_FOUND)
+    # Served from the token cache, no query while the account's token is cached
+    return Response({'result':is_valid_token(request.data['account_id'],request.data['token'])},status=status.HTTP_200_OK)
@@ -10,6 +10,7 @@ from ...serializers import *
 from decouple import config
 from uuid import uuid4
 from time import time
+from ...caches.tokens import cache_account_token
 
 TOKEN_LIFETIME = int(config('TOKEN_LIFETIME_SECOND')) # (Second)
 
@@ -22,6 +23,7 @@ def login(request):
             account.token = uuid4().hex
             account.token_expire = int(time()+TOKEN_LIFETIME)
             account.save()
+            cache_account_token(account)
             return Response(model_to_dict(account),status=status.HTTP_202_ACCEPTED)
         else:
             return Response({'message':"Incorrect password!"},status=status.HTTP_406_NOT_ACCEPTABLE)
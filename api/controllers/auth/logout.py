@@ -10,6 +10,7 @@ from ...serializers import *
 from decouple import config
 from uuid import uuid4
 from time import time
+from ...caches.tokens import cache_account_token
 
 def logout(request):
     try:
@@ -17,6 +18,7 @@ def logout(request):
         if account.token == request.data['token']:
             account.token = None
             account.save()
+            cache_account_token(account)
             return Response(model_to_dict(account),status=status.HTTP_200_OK)
         else:
             return Response({'message':"Invalid token!"},status=status.HTTP_200_OK)
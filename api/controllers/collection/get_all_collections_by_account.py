@@ -7,6 +7,7 @@ from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
 from ...serializers import *
+from ...permissions.effective import get_effective_permissions
 
 def populated_problems(collections: Collection):
     problemCollections = CollectionProblem.objects.filter(collection__in=collections)
@@ -24,7 +25,7 @@ def get_all_collections_by_account(account:Account):
     collections = populated_problems(collections)
     serialize = CollectionPopulateCollectionProblemsPopulateProblemSerializer(collections,many=True)
 
-    manageableCollections = Collection.objects.filter(collectiongrouppermission__permission_manage_collections=True,collectiongrouppermission__group__in=GroupMember.objects.filter(account=account).values_list("group",flat=True)).order_by('-updated_date')
+    manageableCollections = Collection.objects.filter(collection_id__in=get_effective_permissions(account).manage_collections).order_by('-updated_date')
     manageableCollections = populated_problems(manageableCollections)
     manageableSerialize = CollectionPopulateCollectionProblemsPopulateProblemSerializer(manageableCollections,many=True)
 
@@ -7,6 +7,7 @@ from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
 from ...serializers import *
+from ...permissions.effective import invalidate_effective_permissions
 
 def update_group_permissions_collection(collection:Collection,request):
 
@@ -25,6 +26,8 @@ def update_group_permissions_collection(collection:Collection,request):
         ))
 
     CollectionGroupPermission.objects.bulk_create(collection_group_permissions)
+    # bulk_create sends no post_save
+    invalidate_effective_permissions()
 
     collection.group_permissions = collection_group_permissions
     serialize = CollectionPopulateCollectionGroupPermissionsPopulateGroupSerializer(collection)
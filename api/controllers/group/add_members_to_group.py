@@ -7,6 +7,7 @@ from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
 from ...serializers import *
+from ...permissions.effective import invalidate_effective_permissions
 
 def add_members_to_group(group:Group,request):
 
@@ -19,6 +20,8 @@ def add_members_to_group(group:Group,request):
         ))
 
     GroupMember.objects.bulk_create(group_members)
+    # bulk_create sends no post_save
+    invalidate_effective_permissions()
     group.members = group_members
 
     serialize = GroupPopulateGroupMemberPopulateAccountSecureSerializer(group)
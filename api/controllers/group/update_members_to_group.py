@@ -7,6 +7,7 @@ from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
 from ...serializers import *
+from ...permissions.effective import invalidate_effective_permissions
 
 def update_members_to_group(group:Group,request):
     GroupMember.objects.filter(group=group).delete()
@@ -20,6 +21,8 @@ def update_members_to_group(group:Group,request):
         ))
 
     GroupMember.objects.bulk_create(group_members)
+    # bulk_create sends no post_save
+    invalidate_effective_permissions()
     group.members = group_members
 
     serialize = GroupPopulateGroupMemberPopulateAccountSecureSerializer(group)
@@ -2,16 +2,21 @@ from api.utility import passwordEncryption
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from api.sandbox.grader import PythonGrader,RuntimeResult
+from api.sandbox.queue import grading_queue
 from ...constant import GET,POST,PUT,DELETE
 from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
+from django.conf import settings
 from ...serializers import *
 
 def create_problem(account_id:str,request):
     account = Account.objects.get(account_id=account_id)
+    time_limit = float(request.data['time_limit'])
+    memory_limit = int(request.data.get('memory_limit',256))
     
-    running_result = PythonGrader(request.data['solution'],request.data['testcases'],1,1.5).generate_output()
+    with grading_queue.section():
+        running_result = PythonGrader(request.data['solution'],request.data['testcases'],time_limit,settings.GRADER_TESTCASE_CONCURRENCY,memory_limit*1024*1024).generate_output()
 
     # if not running_result.runnable:
     #     return Response({'detail': 'Error during creating. Your code may has an error/timeout!','output': running_result.getResult()},status=status.HTTP_406_NOT_ACCEPTABLE)
@@ -22,7 +27,10 @@ def create_problem(account_id:str,request):
         title = request.data['title'],
         description = request.data['description'],
         solution = request.data['solution'],
-        time_limit = request.data['time_limit'],
+        time_limit = time_limit,
+        memory_limit = memory_limit,
+        fail_fast = request.data.get('fail_fast',False),
+        max_consecutive_timeouts = int(request.data.get('max_consecutive_timeouts',0)),
         allowed_languages = request.data['allowed_languages'],
     )
     problem.save()
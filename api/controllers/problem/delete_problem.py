@@ -2,6 +2,7 @@ from api.utility import passwordEncryption
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from api.sandbox.grader import PythonGrader
+from api.caches.testcases import invalidate_problem_testcases
 from ...constant import GET,POST,PUT,DELETE
 from ...models import *
 from rest_framework import status
@@ -14,7 +15,9 @@ def delete_problem(problem:Problem):
     # except Problem.DoesNotExist:
     #     return Response({'detail': "Problem doesn't exist!"},status=status.HTTP_404_NOT_FOUND)
     testcases = Testcase.objects.filter(problem=problem)
+    problem_id = problem.problem_id
 
     problem.delete()
     testcases.delete()
+    invalidate_problem_testcases(problem_id)
     return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -6,23 +6,37 @@ from ...constant import GET,POST,PUT,DELETE
 from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
+from django.db.models import Prefetch
 from ...serializers import *
 
-def get_all_problem_with_best_submission(account:Account):
+def get_all_problem_with_best_submission(account:Account,request):
 
-    problems = Problem.objects.all().order_by('-updated_date')
+    start = int(request.query_params.get("start",0))
+    end = int(request.query_params.get("end",-1))
+    if end == -1: end = None
+
+    problems = Problem.objects.select_related('creator').order_by('-updated_date')
+    total = problems.count()
+
+    if account:
+        # The account's best submission of each problem over every topic, with its testcases
+        problems = problems.prefetch_related(
+            Prefetch('bestsubmission_set',
+                queryset=BestSubmission.objects.filter(account=account).select_related('submission').order_by('-submission__passed_ratio','-submission__submission_id'),
+                to_attr='best_submissions'),
+            Prefetch('best_submissions__submission__submissiontestcase_set',
+                queryset=SubmissionTestcase.objects.only('submission_id','is_passed','runtime_status','wall_time','cpu_time','memory').order_by('position'),
+                to_attr='runtime_output')
+        )
+    problems = problems[start:end]
 
     for problem in problems:
-        best_submission = Submission.objects.filter(problem=problem,account=account).order_by('-passed_ratio','-submission_id').first()
-        if not (best_submission is None):
-            testcases = SubmissionTestcase.objects.filter(submission=best_submission)
-            best_submission.runtime_output = testcases
-            problem.best_submission = best_submission
-        else:
-            problem.best_submission = None
+        problem.best_submission = problem.best_submissions[0].submission if account and problem.best_submissions else None
     
     problem_ser = ProblemPopulateAccountAndSubmissionPopulateSubmissionTestcasesSecureSerializer(problems,many=True)
-    return Response({"problems":problem_ser.data},status=status.HTTP_200_OK)
-
-    
-    # return Response({"problems":problem_ser.data},status=status.HTTP_200_OK)
\ No newline at end of file
+    return Response({
+        "start":start,
+        "end":end,
+        "total_problems":total,
+        "problems":problem_ser.data
+    },status=status.HTTP_200_OK)
@@ -22,9 +22,9 @@ def get_all_problems_by_account(account:Account,request):
     for problem in personalProblems:
         problem.testcases = Testcase.objects.filter(problem=problem,deprecated=False)
 
+    # A subquery, the account's cached id set can hold every problem of the site
     manageableProblems = Problem.objects.filter(
-        problemgrouppermission__permission_manage_problems=True,
-        problemgrouppermission__group__in=GroupMember.objects.filter(account=account).values_list("group",flat=True),
+        problem_id__in=ProblemGroupPermission.objects.filter(permission_manage_problems=True,group__groupmember__account=account).values('problem_id'),
         title__icontains=query
     ).order_by('-updated_date')
     maxManageable = len(manageableProblems)
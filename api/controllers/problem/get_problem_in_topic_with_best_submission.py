@@ -17,7 +17,7 @@ def get_problem_in_topic_with_best_submission(account_id:str,topic_id:str,proble
     best_submission = BestSubmission.objects.filter(problem=problem,topic=topic,account=account).first()
     # print(problem.problem_id,problem.title)
     if not (best_submission is None):
-        testcases = SubmissionTestcase.objects.filter(submission=best_submission.submission)
+        testcases = SubmissionTestcase.objects.filter(submission=best_submission.submission).order_by('position')
         print(testcases)
         best_submission.runtime_output = testcases
         problem.best_submission = best_submission
@@ -0,0 +1,23 @@
+from rest_framework.response import Response
+from ...models import *
+from rest_framework import status
+
+PERCENTILES = [50,95]
+
+def percentile(queryset,field:str,count:int,p:int):
+    # Nearest-rank percentile, the database sorts and only one row comes back
+    if count == 0:
+        return None
+    index = max(0,(p*count+99)//100 - 1)
+    return queryset.order_by(field).values_list(field,flat=True)[index]
+
+def get_problem_runtime_stats(problem:Problem):
+    """p50/p95 of the per-testcase wall time, CPU time and memory of a problem's submissions"""
+    result = {'problem_id': problem.problem_id}
+    for field in ['wall_time','cpu_time','memory']:
+        testcases = SubmissionTestcase.objects.filter(submission__problem=problem,**{f'{field}__isnull': False})
+        count = testcases.count()
+        result[field] = {'count': count}
+        for p in PERCENTILES:
+            result[field][f'p{p}'] = percentile(testcases,field,count,p)
+    return Response(result,status=status.HTTP_200_OK)
@@ -2,6 +2,7 @@ from api.utility import passwordEncryption
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from api.sandbox.grader import PythonGrader
+from api.caches.testcases import invalidate_problem_testcases
 from ...constant import GET,POST,PUT,DELETE
 from ...models import *
 from rest_framework import status
@@ -12,5 +13,7 @@ def remove_bulk_problems(request):
     target = request.data.get("problem",[])
     problems = Problem.objects.filter(problem_id__in=target)
     problems.delete()
+    for problem_id in target:
+        invalidate_problem_testcases(problem_id)
     return Response(status=status.HTTP_204_NO_CONTENT)
     
\ No newline at end of file
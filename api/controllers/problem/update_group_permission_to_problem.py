@@ -7,6 +7,7 @@ from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
 from ...serializers import *
+from ...permissions.effective import invalidate_effective_permissions
 
 def update_group_permission_to_problem(problem:Problem,request):
     ProblemGroupPermission.objects.filter(problem=problem).delete()
@@ -22,6 +23,8 @@ def update_group_permission_to_problem(problem:Problem,request):
         ))
 
     ProblemGroupPermission.objects.bulk_create(problem_group_permissions)
+    # bulk_create sends no post_save
+    invalidate_effective_permissions()
 
     problem.group_permissions = problem_group_permissions
     problem.testcases = Testcase.objects.filter(problem=problem)
@@ -2,10 +2,13 @@ from api.utility import passwordEncryption
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from api.sandbox.grader import Grader
+from api.sandbox.queue import grading_queue
+from api.caches.testcases import invalidate_problem_testcases
 from ...constant import GET,POST,PUT,DELETE
 from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
+from django.conf import settings
 from ...serializers import *
 from django.utils import timezone
 
@@ -20,14 +23,18 @@ def update_problem(problem:Problem,request):
     problem.language = request.data.get("language",problem.language)
     problem.description = request.data.get("description",problem.description)
     problem.solution = request.data.get("solution",problem.solution)
-    problem.time_limit = request.data.get("time_limit",problem.time_limit)  
+    problem.time_limit = float(request.data.get("time_limit",problem.time_limit))
+    problem.memory_limit = int(request.data.get("memory_limit",problem.memory_limit))
+    problem.fail_fast = request.data.get("fail_fast",problem.fail_fast)
+    problem.max_consecutive_timeouts = int(request.data.get("max_consecutive_timeouts",problem.max_consecutive_timeouts))
     problem.is_private = request.data.get("is_private",problem.is_private)
     problem.allowed_languages = request.data.get("allowed_languages",problem.allowed_languages)
 
     problem.updated_date = timezone.now()
 
     if 'testcases' in request.data:
-        running_result = Grader[request.data['language']](problem.solution,request.data['testcases'],1,1.5).generate_output()
+        with grading_queue.section():
+            running_result = Grader[request.data['language']](problem.solution,request.data['testcases'],problem.time_limit,settings.GRADER_TESTCASE_CONCURRENCY,problem.memory_limit*1024*1024).generate_output()
 
         # if not running_result.runnable:
         #     return Response({'detail': 'Error during editing. Your code may has an error/timeout!'},status=status.HTTP_406_NOT_ACCEPTABLE)
@@ -45,6 +52,7 @@ def update_problem(problem:Problem,request):
             testcase2.save()
             testcase_result.append(testcase2)
         problem.save()
+        invalidate_problem_testcases(problem.problem_id)
         problem_serialize = ProblemSerializer(problem)
         testcases_serialize = TestcaseSerializer(testcase_result,many=True)
 
@@ -53,7 +61,8 @@ def update_problem(problem:Problem,request):
     if 'solution' in request.data:
         testcases = Testcase.objects.filter(problem=problem,deprecated=False)
         program_input = [i.input for i in testcases]
-        running_result = Grader[request.data['language']](problem.solution,program_input,1,1.5).generate_output()
+        with grading_queue.section():
+            running_result = Grader[request.data['language']](problem.solution,program_input,problem.time_limit,settings.GRADER_TESTCASE_CONCURRENCY,problem.memory_limit*1024*1024).generate_output()
 
         if not running_result.runnable:
             return Response({'detail': 'Error during editing. Your code may has an error/timeout!'},status=status.HTTP_406_NOT_ACCEPTABLE)
@@ -1,48 +1,63 @@
-from api.utility import passwordEncryption
-from rest_framework.response import Response
-from rest_framework.decorators import api_view
-from api.sandbox.grader import PythonGrader
-from ...constant import GET,POST,PUT,DELETE
+import threading
+from django.conf import settings
+from django.db import transaction,close_old_connections
+from django.db.models import Sum,Avg
 from ...models import *
-from rest_framework import status
-from django.forms.models import model_to_dict
-from ...serializers import *
-from ...difficulty_predictor.preprocess import *
 from ...difficulty_predictor.predictor import *
+from ...difficulty_predictor.preprocess import MAX_TIME_GAP,CAPPED_TIME_GAP
 
-try:
-    import pandas as pd
-    pd.options.mode.chained_assignment = None
-    success = True
-except:
-    success = False
+def time_gap(previous_date,date) -> float:
+    gap = max(0,(date-previous_date).total_seconds())
+    return CAPPED_TIME_GAP if gap > MAX_TIME_GAP else gap
 
-def update_problem_difficulty(problem:Problem):
+def record_first_passed_statistic(submission:Submission):
+    """Add a graded submission to its (problem,account) FirstPassedStatistic, attempts after the first pass are ignored."""
+    with transaction.atomic():
+        statistic,_ = FirstPassedStatistic.objects.select_for_update().get_or_create(problem_id=submission.problem_id,account_id=submission.account_id)
+        if statistic.is_passed:
+            return
+        if statistic.last_date:
+            statistic.time_used += time_gap(statistic.last_date,submission.date)
+        statistic.total_attempts += 1
+        statistic.last_date = submission.date
+        statistic.is_passed = submission.is_passed
+        statistic.save()
 
-    if not success:
+def update_problem_difficulty(problem:Problem):
+    if Submission.objects.filter(problem=problem).count() < 10:
         return
 
-    submissions = Submission.objects.filter(problem=problem)
+    # Same features as modelgrader_preprocessor, from the incremental statistics
+    statistic = FirstPassedStatistic.objects.filter(problem=problem).aggregate(total_attempts=Sum('total_attempts'),time_used=Avg('time_used'))
+    difficulty = predict(statistic['total_attempts'],statistic['time_used'])
+
+    # Only the difficulty column, the problem may be edited meanwhile
+    Problem.objects.filter(problem_id=problem.problem_id).update(difficulty=difficulty)
+    problem.difficulty = difficulty
 
-    if submissions.count() < 10:
+scheduled_updates = {}
+scheduled_updates_lock = threading.Lock()
+
+def run_scheduled_difficulty_update(problem_id:str):
+    with scheduled_updates_lock:
+        scheduled_updates.pop(problem_id,None)
+    try:
+        update_problem_difficulty(Problem.objects.get(problem_id=problem_id))
+    except Problem.DoesNotExist:
+        pass
+    finally:
+        close_old_connections()
+
+def schedule_problem_difficulty_update(problem_id:str):
+    """Recompute the difficulty DIFFICULTY_UPDATE_DELAY seconds from now, unless a recompute is already pending."""
+    if settings.DIFFICULTY_UPDATE_DELAY <= 0:
+        update_problem_difficulty(Problem.objects.get(problem_id=problem_id))
         return
 
-    # Change them to DataFrame
-    df = pd.DataFrame(data={
-        'submission_id': [i.submission_id for i in submissions],
-        'account_id': [i.account_id for i in submissions],
-        'problem_id': [i.problem_id for i in submissions],
-        'score': [i.score for i in submissions],
-        'max_score': [i.max_score for i in submissions],
-        'passed_ratio': [i.passed_ratio for i in submissions],
-        'language': [i.language for i in submissions],
-        'submission_code': [i.submission_code for i in submissions],
-        'date': [i.date for i in submissions],
-        'is_passed': [i.is_passed for i in submissions],
-    })
-
-    [total_attempt,time_used] = modelgrader_preprocessor(df)
-    difficulty = predict(total_attempt,time_used)
-    
-    problem.difficulty = difficulty
-    problem.save()
\ No newline at end of file
+    with scheduled_updates_lock:
+        if problem_id in scheduled_updates:
+            return
+        timer = threading.Timer(settings.DIFFICULTY_UPDATE_DELAY,run_scheduled_difficulty_update,args=[problem_id])
+        timer.daemon = True
+        scheduled_updates[problem_id] = timer
+        timer.start()
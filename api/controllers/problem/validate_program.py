@@ -2,15 +2,18 @@ from api.utility import passwordEncryption
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from api.sandbox.grader import Grader,ProgramGrader,RuntimeResultList
+from api.sandbox.queue import grading_queue
 from ...constant import GET,POST,PUT,DELETE
 from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
+from django.conf import settings
 from ...serializers import *
 
 def validate_program(request):
     grader:ProgramGrader = Grader[request.data['language']]
-    result:RuntimeResultList = grader(request.data['source_code'],request.data['testcases'],1,request.data['time_limited']).generate_output()
+    with grading_queue.section():
+        result:RuntimeResultList = grader(request.data['source_code'],request.data['testcases'],request.data['time_limited'],settings.GRADER_TESTCASE_CONCURRENCY).generate_output()
 
     print(result.getResult())
     print(result.runnable)
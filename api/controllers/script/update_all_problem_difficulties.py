@@ -0,0 +1,37 @@
+from rest_framework.response import Response
+from ...models import *
+from rest_framework import status
+from ...difficulty_predictor.preprocess import *
+from ...difficulty_predictor.predictor import *
+
+# Same threshold as update_problem_difficulty
+MIN_SUBMISSIONS = 10
+
+def recompute_all_problem_difficulties(batch_size:int=1000) -> int:
+    """Recompute every problem's difficulty from one scan of Submission, returns the number of problems changed."""
+    pd = import_pandas()
+    if pd is None:
+        return 0
+
+    # One streamed query, only the columns the features need
+    submissions = Submission.objects.values_list(*PREPROCESSOR_COLUMNS).iterator(chunk_size=batch_size*10)
+    submission_df = pd.DataFrame.from_records(submissions,columns=PREPROCESSOR_COLUMNS)
+    if submission_df.empty:
+        return 0
+
+    submission_count = submission_df.groupby('problem_id').size()
+    features = modelgrader_features(submission_df)
+    features = features[submission_count.reindex(features.index) >= MIN_SUBMISSIONS]
+    difficulties = dict(zip(features.index,predict_many(features[['avg_first_passed_total_attempts','avg_first_passed_time_used']].to_numpy())))
+
+    changed = [
+        Problem(problem_id=problem_id,difficulty=difficulties[problem_id])
+        for problem_id,difficulty in Problem.objects.filter(problem_id__in=list(difficulties)).values_list('problem_id','difficulty').iterator()
+        if difficulty != difficulties[problem_id]
+    ]
+    Problem.objects.bulk_update(changed,['difficulty'],batch_size=batch_size)
+    return len(changed)
+
+def update_all_problem_difficulties(request):
+    updated = recompute_all_problem_difficulties()
+    return Response({'message': 'Success!','updated': updated},status=status.HTTP_201_CREATED)
@@ -28,7 +28,7 @@ def get_all_submissions_by_creator_problem(problem:Problem, request):
     result = []
     
     for submission in submissions:
-        submission_testcases = SubmissionTestcase.objects.filter(submission=submission)
+        submission_testcases = SubmissionTestcase.objects.filter(submission=submission).order_by('position')
         submission.runtime_output = submission_testcases
         result.append(submission)
 
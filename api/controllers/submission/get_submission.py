@@ -0,0 +1,13 @@
+from api.utility import passwordEncryption
+from rest_framework.response import Response
+from rest_framework.decorators import api_view
+from ...constant import GET,POST,PUT,DELETE
+from ...models import *
+from rest_framework import status
+from django.forms.models import model_to_dict
+from ...serializers import *
+
+def get_submission(submission:Submission):
+    submission.runtime_output = SubmissionTestcase.objects.filter(submission=submission).order_by('position')
+    serialize = SubmissionPopulateSubmissionTestcaseSecureSerializer(submission)
+    return Response(serialize.data,status=status.HTTP_200_OK)
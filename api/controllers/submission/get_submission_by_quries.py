@@ -7,10 +7,75 @@ from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
 from ...serializers import *
+from django.db.models import Q,Prefetch
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+class InvalidCursor(Exception):
+    pass
+
+def encode_cursor(submission:Submission,ordering:list[str]) -> str:
+    values = []
+    for field in ordering:
+        value = getattr(submission,field.lstrip('-'))
+        values.append(value.isoformat() if field.lstrip('-') == 'date' else value)
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decode_cursor(cursor:str,ordering:list[str]) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise InvalidCursor()
+    if not isinstance(values,list) or len(values) != len(ordering):
+        raise InvalidCursor()
+    for i in range(len(ordering)):
+        if ordering[i].lstrip('-') == 'date':
+            values[i] = parse_datetime(str(values[i]))
+            if values[i] is None:
+                raise InvalidCursor()
+    return values
+
+def after_cursor(ordering:list[str],values:list) -> Q:
+    """Rows that come after values in ordering, the last field must be unique"""
+    condition = Q()
+    for i in reversed(range(len(ordering))):
+        field = ordering[i].lstrip('-')
+        lookup = 'lt' if ordering[i].startswith('-') else 'gt'
+        past = Q(**{f'{field}__{lookup}': values[i]})
+        condition = past if i == len(ordering)-1 else past | (Q(**{field: values[i]}) & condition)
+    return condition
+
+def submission_page(submissions,ordering:list[str],cursor:str,limit:int) -> tuple[list[Submission],str]:
+    """One keyset page of submissions and the cursor of the next one (None on the last page)"""
+    if cursor:
+        submissions = submissions.filter(after_cursor(ordering,decode_cursor(cursor,ordering)))
+    page = list(submissions.order_by(*ordering)[:limit+1])
+    if len(page) <= limit:
+        return page,None
+    page = page[:limit]
+    return page,encode_cursor(page[-1],ordering)
+
+def stream_submission_pages(submissions,ordering:list[str],cursor:str,limit:int,serializer_class):
+    # Only one page is held in memory at a time
+    yield '{"submissions": ['
+    first = True
+    while True:
+        page,cursor = submission_page(submissions,ordering,cursor,limit)
+        for data in serializer_class(page,many=True).data:
+            yield ('' if first else ',') + json.dumps(data,default=str)
+            first = False
+        if cursor is None:
+            break
+    yield ']}'
 
 def get_submission_by_quries(request):
     submissions = Submission.objects.all()
-    
+
     # Query params
     problem_id = str(request.query_params.get("problem_id", ""))
     account_id = str(request.query_params.get("account_id", ""))
@@ -20,34 +85,59 @@ def get_submission_by_quries(request):
     sort_date = int(request.query_params.get("sort_date", 0))
     start = int(request.query_params.get("start", -1))
     end = int(request.query_params.get("end", -1))
+    # Keyset pagination, limit is the page size and cursor comes from next_cursor of the previous page
+    limit = min(max(int(request.query_params.get("limit", DEFAULT_PAGE_SIZE)),1),MAX_PAGE_SIZE)
+    cursor = request.query_params.get("cursor", None)
+    include_code = int(request.query_params.get("code", 1))
+    stream = int(request.query_params.get("stream", 0))
 
     if problem_id != "":
         submissions = submissions.filter(problem_id=problem_id)
     if account_id != "":
         submissions = submissions.filter(account_id=account_id)
     if topic_id != "":
-        submissions = submissions.filter(problem__topic_id=topic_id)
+        submissions = submissions.filter(topic_id=topic_id)
 
     if passed == 0:
         submissions = submissions.filter(is_passed=False)
     elif passed == 1:
         submissions = submissions.filter(is_passed=True)
 
+    # submission_id breaks ties so every row has a unique position for the cursor
+    ordering = ['-date','-submission_id']
     if sort_score == -1:
-        submissions = submissions.order_by('passed_ratio')
+        ordering = ['passed_ratio','date','submission_id']
     elif sort_score == 1:
-        submissions = submissions.order_by('-passed_ratio')
+        ordering = ['-passed_ratio','-date','-submission_id']
 
     if sort_date == -1:
-        submissions = submissions.order_by('date')
+        ordering = ['date','submission_id']
     elif sort_date == 1:
-        submissions = submissions.order_by('-date')
+        ordering = ['-date','-submission_id']
+
+    submissions = submissions.select_related('problem','topic').prefetch_related(
+        Prefetch('submissiontestcase_set',
+            queryset=SubmissionTestcase.objects.only('submission_id','is_passed','runtime_status','wall_time','cpu_time','memory').order_by('position'),
+            to_attr='runtime_output')
+    )
+    serializer_class = SubmissionPopulateSubmissionTestcaseAndProblemSecureSerializer
+    if not include_code:
+        submissions = submissions.defer('submission_code')
+        serializer_class = SubmissionPopulateSubmissionTestcaseAndProblemWithoutCodeSecureSerializer
+
+    try:
+        if stream:
+            if cursor:
+                decode_cursor(cursor,ordering)
+            return StreamingHttpResponse(stream_submission_pages(submissions,ordering,cursor,limit,serializer_class),content_type="application/json")
 
-    if start != -1 and end != -1:
-        submissions = submissions[start:end]
+        if start != -1 and end != -1:
+            page = list(submissions.order_by(*ordering)[start:end])
+            next_cursor = None
+        else:
+            page,next_cursor = submission_page(submissions,ordering,cursor,limit)
+    except InvalidCursor:
+        return Response({'message':"Invalid cursor!"},status=status.HTTP_400_BAD_REQUEST)
 
-    for submission in submissions:
-        submission.runtime_output = SubmissionTestcase.objects.filter(submission=submission)
-        
-    serialize = SubmissionPopulateSubmissionTestcaseAndProblemSecureSerializer(submissions,many=True)
-    return Response({"submissions": serialize.data},status=status.HTTP_200_OK)
+    serialize = serializer_class(page,many=True)
+    return Response({"submissions": serialize.data,"next_cursor": next_cursor},status=status.HTTP_200_OK)
@@ -22,7 +22,7 @@ def get_submissions_by_account_problem(account_id:str,problem_id:str):
     result = []
     
     for submission in submissions:
-        submission_testcases = SubmissionTestcase.objects.filter(submission=submission)
+        submission_testcases = SubmissionTestcase.objects.filter(submission=submission).order_by('position')
         submission.runtime_output = submission_testcases
         result.append(submission)
 
@@ -19,13 +19,13 @@ def get_submissions_by_account_problem_in_topic(account_id:str,problem_id:str,to
     result = []
     
     for submission in submissions:
-        submission_testcases = SubmissionTestcase.objects.filter(submission=submission)
+        submission_testcases = SubmissionTestcase.objects.filter(submission=submission).order_by('position')
         submission.runtime_output = submission_testcases
         result.append(submission)
     
     best_submission = BestSubmission.objects.filter(problem=problem_id,topic=topic_id,account=account_id).first()
     if best_submission:
-        best_submission.submission.runtime_output = SubmissionTestcase.objects.filter(submission=best_submission.submission)
+        best_submission.submission.runtime_output = SubmissionTestcase.objects.filter(submission=best_submission.submission).order_by('position')
         best_submission_serializer = SubmissionPopulateSubmissionTestcaseSecureSerializer(best_submission.submission)
         best_submission_result = best_submission_serializer.data
     else:
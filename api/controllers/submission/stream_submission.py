@@ -0,0 +1,43 @@
+import json
+from django.http import StreamingHttpResponse
+from ...models import *
+from ...serializers import *
+from django.conf import settings
+from time import sleep,monotonic
+
+POLL_INTERVAL = 0.5 # (Second)
+
+def submission_events(submission_id:str):
+    sent = 0
+    deadline = monotonic()+settings.GRADER_STREAM_TIMEOUT
+    while True:
+        submission = Submission.objects.get(submission_id=submission_id)
+        # Testcases are saved in grading order, position is the testcase index
+        testcases = SubmissionTestcase.objects.filter(submission=submission,position__gte=sent).order_by('position')
+        for testcase in testcases:
+            yield f"event: testcase\ndata: {json.dumps({'index': testcase.position, **SubmissionTestcaseSecureSerializer(testcase).data})}\n\n"
+            sent = testcase.position+1
+
+        if submission.status in ("DONE","ERROR"):
+            submission.runtime_output = SubmissionTestcase.objects.filter(submission=submission).order_by('position')
+            serialize = SubmissionPopulateSubmissionTestcaseSecureSerializer(submission)
+            yield f"event: {submission.status.lower()}\ndata: {json.dumps(serialize.data,default=str)}\n\n"
+            return
+        if monotonic() >= deadline:
+            # The grading may have been lost with its process, the client can reconnect
+            yield f"event: timeout\ndata: {json.dumps({'status': submission.status,'sent': sent})}\n\n"
+            return
+        sleep(POLL_INTERVAL)
+
+def stream_submission(submission:Submission):
+    """
+    Server-sent events of a submission's testcases as they are graded.
+
+    The response holds a web worker for up to GRADER_STREAM_TIMEOUT seconds,
+    so it only suits threaded or async workers. Other clients should poll
+    GET submissions/<id> until its status is DONE or ERROR.
+    """
+    response = StreamingHttpResponse(submission_events(submission.submission_id),content_type="text/event-stream")
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
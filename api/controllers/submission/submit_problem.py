@@ -1,48 +1,145 @@
 from api.utility import passwordEncryption
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
-from api.sandbox.grader import PythonGrader,Grader,ProgramGrader
+from api.sandbox.grader import PythonGrader,Grader,ProgramGrader,GradingResult,GradingResultList
 from ...constant import GET,POST,PUT,DELETE
 from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
+from django.conf import settings
+from django.db import close_old_connections,transaction,IntegrityError
+from django.utils import timezone
+from datetime import timedelta
+import logging
 from ...serializers import *
 from ...utility import regexMatching
-from time import sleep
+from ...sandbox.queue import grading_queue,grading_executor
+from ...caches.testcases import get_problem_testcases
 from ..problem.update_problem_difficulty import *
+from ..account.update_daily_submission_count import *
+from ..topic.update_topic_progress import *
 
-QUEUE = [0,0,0,0,0,0,0,0,0,0]
+logger = logging.getLogger(__name__)
 
-def avaliableQueue():
-    global QUEUE
-    for i in range(len(QUEUE)):
-        if QUEUE[i] == 0:
-            return i
-    return -1
+def grade_submission_code(problem:Problem,language:str,submission_code:str,solution_input:list[str],solution_output:list[str],on_result=None) -> GradingResultList:
+    if not regexMatching(problem.submission_regex,submission_code):
+        grading_result = [GradingResult(solution_input[i],None,"ERROR",solution_output[i],False) for i in range(len(solution_input))]
+        if on_result:
+            for i in range(len(grading_result)):
+                on_result(i,grading_result[i])
+        return GradingResultList(grading_result)
+
+    grader: ProgramGrader = Grader[language]
+    with grading_queue.section():
+        return grader(submission_code,solution_input,problem.time_limit,settings.GRADER_TESTCASE_CONCURRENCY,problem.memory_limit*1024*1024).grading(solution_output,on_result,problem.fail_fast,problem.max_consecutive_timeouts)
+
+def update_best_submission(submission:Submission):
+    """Point the (problem,account,topic) BestSubmission at submission unless it holds a better one, a tie goes to the newer"""
+    best_submissions = BestSubmission.objects.filter(problem_id=submission.problem_id,account_id=submission.account_id,topic_id=submission.topic_id)
+    better = best_submissions.filter(passed_ratio__lte=submission.passed_ratio)
+
+    # A single conditional UPDATE, concurrent submissions can't overwrite a better result
+    if better.update(submission=submission,passed_ratio=submission.passed_ratio) or best_submissions.exists():
+        return
+    try:
+        with transaction.atomic():
+            BestSubmission.objects.create(
+                problem_id = submission.problem_id,
+                account_id = submission.account_id,
+                topic_id = submission.topic_id,
+                submission = submission,
+                passed_ratio = submission.passed_ratio
+            )
+    except IntegrityError:
+        # A concurrent submission created the row first
+        better.update(submission=submission,passed_ratio=submission.passed_ratio)
+
+def grade_pending_submission(submission_id:str):
+    """Background job of an asynchronous submission. SubmissionTestcase rows are saved as each testcase finishes."""
+    try:
+        submission = Submission.objects.select_related('problem','account','topic').get(submission_id=submission_id)
+        testcase_ids,solution_input,solution_output = get_problem_testcases(submission.problem_id)
+
+        submission.status = "GRADING"
+        submission.save(update_fields=['status'])
+
+        def save_testcase(index:int,result:GradingResult):
+            SubmissionTestcase(
+                submission = submission,
+                testcase_id = testcase_ids[index],
+                output = result.output,
+                is_passed = result.is_passed,
+                runtime_status = result.runtime_status,
+                wall_time = result.wall_time,
+                cpu_time = result.cpu_time,
+                memory = result.memory,
+                position = index
+            ).save()
+
+        grading_result = grade_submission_code(submission.problem,submission.language,submission.submission_code,solution_input,solution_output,save_testcase)
+
+        total_score = sum([i.is_passed for i in grading_result.data if i.is_passed])
+        max_score = len(grading_result.data)
+
+        submission.is_passed = grading_result.is_passed
+        submission.score = total_score
+        submission.max_score = max_score
+        submission.passed_ratio = total_score/max_score
+        submission.wall_time = grading_result.wall_time
+        submission.cpu_time = grading_result.cpu_time
+        submission.memory = grading_result.memory
+        submission.status = "DONE"
+        with transaction.atomic():
+            submission.save()
+            update_best_submission(submission)
+            record_topic_progress(submission)
+            record_first_passed_statistic(submission)
+        schedule_problem_difficulty_update(submission.problem_id)
+    except Exception:
+        # Runs in grading_executor, nobody reads the Future's exception
+        logger.exception("Grading of submission %s failed",submission_id)
+        Submission.objects.filter(submission_id=submission_id).update(status="ERROR")
+    finally:
+        close_old_connections()
+
+def fail_stale_submissions(max_age:float) -> int:
+    """
+    Mark asynchronous submissions still PENDING or GRADING after max_age seconds
+    as ERROR. Their jobs lived in the grading_executor of a process that has
+    since exited, so nothing would ever finish them.
+    """
+    return Submission.objects.filter(status__in=["PENDING","GRADING"],date__lt=timezone.now()-timedelta(seconds=max_age)).update(status="ERROR")
 
 def submit_problem_function(account_id:str,problem_id:str,topic_id:str,request):
-    global QUEUE
     problem = Problem.objects.get(problem_id=problem_id)
-    testcases = Testcase.objects.filter(problem=problem,deprecated=False)
     account = Account.objects.get(account_id=account_id)
 
+    if int(request.query_params.get("async",0)):
+        submission = Submission(
+            problem = problem,
+            account = account,
+            language = request.data['language'],
+            submission_code = request.data['submission_code'],
+            is_passed = False,
+            status = "PENDING"
+        )
+        if topic_id:
+            submission.topic_id = topic_id
+        with transaction.atomic():
+            submission.save()
+            record_daily_submission(submission)
+
+        grading_executor.submit(grade_pending_submission,submission.submission_id)
+
+        submission.runtime_output = []
+        testser = SubmissionPopulateSubmissionTestcaseSecureSerializer(submission)
+        return Response(testser.data,status=status.HTTP_202_ACCEPTED)
+
+    testcase_ids,solution_input,solution_output = get_problem_testcases(problem.problem_id)
+
     submission_code = request.data['submission_code']
-    solution_input = [model_to_dict(i)['input'] for i in testcases]
-    solution_output = [model_to_dict(i)['output'] for i in testcases]
 
-    if not regexMatching(problem.submission_regex,submission_code):
-        grading_result = '-'*len(solution_input)
-    else:
-        empty_queue = avaliableQueue()
-        while empty_queue == -1:
-            empty_queue = avaliableQueue()
-            sleep(5)
-
-        QUEUE[empty_queue] = 1
-        # grading_result = grader.grading(empty_queue+1,submission_code,solution_input,solution_output)
-        grader: ProgramGrader = Grader[request.data['language']]
-        grading_result = grader(submission_code,solution_input,empty_queue+1,1.5).grading(solution_output)
-        QUEUE[empty_queue] = 0
+    grading_result = grade_submission_code(problem,request.data['language'],submission_code,solution_input,solution_output)
 
     total_score = sum([i.is_passed for i in grading_result.data if i.is_passed])
     max_score = len(grading_result.data)
@@ -55,54 +152,45 @@ def submit_problem_function(account_id:str,problem_id:str,topic_id:str,request):
         is_passed = grading_result.is_passed,
         score = total_score,
         max_score = max_score,
-        passed_ratio = total_score/max_score
+        passed_ratio = total_score/max_score,
+        wall_time = grading_result.wall_time,
+        cpu_time = grading_result.cpu_time,
+        memory = grading_result.memory
     )
 
     if topic_id:
-        submission.topic = Topic.objects.get(topic_id=topic_id)
+        submission.topic_id = topic_id
 
-    submission.save()
-
-    # Best Submission
-    try:
-        best_submission = None
-        if topic_id:
-            best_submission = BestSubmission.objects.get(problem=problem,account=account,topic=Topic.objects.get(topic_id=topic_id))
-        else:
-            best_submission = BestSubmission.objects.get(problem=problem,account=account)
-    except:
-        best_submission = BestSubmission(
-            problem = problem,
-            account = account,
-            topic = Topic.objects.get(topic_id=topic_id) if topic_id else None,
-            submission = submission
-        )
-        best_submission.save()        
-    else:
-        if submission.passed_ratio >= best_submission.submission.passed_ratio:
-            best_submission.submission = submission
-            best_submission.save()
-
-    # End Best Submission
-            
     submission_testcases = []
     for i in range(len(grading_result.data)):
         submission_testcases.append(SubmissionTestcase(
             submission = submission,
-            testcase = testcases[i],
+            testcase_id = testcase_ids[i],
             output = grading_result.data[i].output,
             is_passed = grading_result.data[i].is_passed,
-            runtime_status = grading_result.data[i].runtime_status
+            runtime_status = grading_result.data[i].runtime_status,
+            wall_time = grading_result.data[i].wall_time,
+            cpu_time = grading_result.data[i].cpu_time,
+            memory = grading_result.data[i].memory,
+            position = i
         ))
 
-    SubmissionTestcase.objects.bulk_create(submission_testcases)
+    # Rows are built beforehand, one short transaction writes them all: a single
+    # commit, and a failure leaves no submission without its testcases
+    with transaction.atomic():
+        submission.save()
+        SubmissionTestcase.objects.bulk_create(submission_testcases)
+        record_daily_submission(submission)
+        update_best_submission(submission)
+        record_topic_progress(submission)
+        record_first_passed_statistic(submission)
 
     submission.runtime_output = submission_testcases
     testser = SubmissionPopulateSubmissionTestcaseSecureSerializer(submission)
 
-    update_problem_difficulty(problem)
+    schedule_problem_difficulty_update(problem.problem_id)
 
     return Response(testser.data,status=status.HTTP_201_CREATED)
 
 def submit_problem(account_id:str,problem_id:str,request):
-    return submit_problem_function(account_id,problem_id,None,request)
\ No newline at end of file
+    return submit_problem_function(account_id,problem_id,None,request)
@@ -7,16 +7,10 @@ from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
 from ...serializers import *
-from django.db.models import Q
+from ...permissions.effective import get_effective_permissions
 
 def get_all_accessed_topics_by_account(account:Account):
-    groups = [gm.group for gm in GroupMember.objects.filter(account=account)]
-    accessedTopics = TopicGroupPermission.objects.filter(Q(group__in=groups) & (Q(permission_view_topics=True) | Q(permission_manage_topics=True)))
-    
-    topics = []
-    for at in accessedTopics:
-        if at.topic not in topics:
-            topics.append(at.topic)
+    topics = Topic.objects.filter(topic_id__in=get_effective_permissions(account).view_topics)
 
     serialize = TopicSerializer(topics,many=True)
 
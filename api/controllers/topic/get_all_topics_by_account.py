@@ -7,6 +7,7 @@ from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
 from ...serializers import *
+from ...permissions.effective import get_effective_permissions
 
 def populated_collections(topics:Topic):
     topicCollections = TopicCollection.objects.filter(topic__in=topics)
@@ -21,8 +22,7 @@ def get_all_topics_by_account(account:Account,request):
     populatedPersonalTopics = populated_collections(personalTopics)
     personalSerialize = TopicPopulateTopicCollectionPopulateCollectionSerializer(populatedPersonalTopics,many=True)
 
-    # print(GroupMember.objects.all().values_list("group",flat=True))
-    manageableTopics = Topic.objects.filter(topicgrouppermission__permission_manage_topics=True,topicgrouppermission__group__in=GroupMember.objects.filter(account=account).values_list("group",flat=True)).order_by('-updated_date')
+    manageableTopics = Topic.objects.filter(topic_id__in=get_effective_permissions(account).manage_topics).order_by('-updated_date')
     populatedmanageableTopics = populated_collections(manageableTopics)
     manageableSerialize = TopicPopulateTopicCollectionPopulateCollectionSerializer(populatedmanageableTopics,many=True)
 
@@ -7,7 +7,8 @@ from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
 from ...serializers import *
-from django.db.models import Q
+from django.db.models import Prefetch,prefetch_related_objects
+from ...permissions.effective import get_effective_permissions
 
 def get_topic_public(topic_id:str,request):
 
@@ -16,43 +17,35 @@ def get_topic_public(topic_id:str,request):
     topic = Topic.objects.get(topic_id=topic_id)
     account = Account.objects.get(account_id=account_id)
 
-    
-    topicCollections = TopicCollection.objects.filter(
-        topic=topic,
-        collection__in=
-            CollectionGroupPermission.objects.filter(
-                Q(group__in=GroupMember.objects.filter(account=account).values_list("group",flat=True)) &
-                (
-                    Q(permission_view_collections=True) | Q(permission_manage_collections=True)
-                )
-            ).values_list("collection",flat=True))
+    # Everything below is resolved against the account's cached effective permissions
+    permissions = get_effective_permissions(account)
 
+    # The topic holds few collections and problems, they are checked against the cached
+    # id sets here rather than sending those sets to SQL as IN lists
+    topicCollections = [tp for tp in TopicCollection.objects.filter(topic=topic).select_related('collection') if tp.collection_id in permissions.view_collections]
+
+    # One query per level for every visible collection: problems with their creator,
+    # then the account's best submissions in this topic and their testcases
+    prefetch_related_objects(topicCollections,Prefetch('collection__collectionproblem_set',
+        queryset=CollectionProblem.objects.select_related('problem__creator'),
+        to_attr='problems'))
+
+    collectionProblems = []
     for tp in topicCollections:
-        # tp.collection.problems = CollectionProblem.objects.filter(collection=tp.collection)
-        
-        # viewPermission = CollectionGroupPermission.objects.filter(collection=tp.collection,group__in=GroupMember.objects.filter(account=account).values_list("group",flat=True),permission_view_collections=True)
-        # print(len(viewPermission))
-        # if len(viewPermission) == 0:
-        #     tp.collection.problems = []
-        #     continue
-        collectionProblems = CollectionProblem.objects.filter(
-            collection=tp.collection,
-            problem__in=ProblemGroupPermission.objects.filter(
-                Q(group__in=GroupMember.objects.filter(account=account).values_list("group",flat=True)) &
-                (Q(permission_view_problems=True) |
-                Q(permission_manage_problems=True))
-            ).values_list("problem",flat=True))
-
-        for cp in collectionProblems:
-            try:
-                best_submission = BestSubmission.objects.get(problem=cp.problem,account=account,topic=topic)
-                best_submission = best_submission.submission
-                best_submission.runtime_output = SubmissionTestcase.objects.filter(submission=best_submission)
-            except:
-                best_submission = None
-            cp.problem.best_submission = best_submission
-
-        tp.collection.problems = collectionProblems
+        tp.collection.problems = [cp for cp in tp.collection.problems if cp.problem_id in permissions.view_problems]
+        collectionProblems += tp.collection.problems
+
+    prefetch_related_objects(collectionProblems,
+        Prefetch('problem__bestsubmission_set',
+            queryset=BestSubmission.objects.filter(account=account,topic=topic).select_related('submission').order_by('-submission__passed_ratio'),
+            to_attr='best_submissions'),
+        Prefetch('problem__best_submissions__submission__submissiontestcase_set',
+            queryset=SubmissionTestcase.objects.only('submission_id','is_passed','runtime_status','wall_time','cpu_time','memory').order_by('position'),
+            to_attr='runtime_output')
+    )
+
+    for cp in collectionProblems:
+        cp.problem.best_submission = cp.problem.best_submissions[0].submission if cp.problem.best_submissions else None
 
     topic.collections = topicCollections
 
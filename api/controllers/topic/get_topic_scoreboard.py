@@ -0,0 +1,33 @@
+from rest_framework.response import Response
+from ...models import *
+from rest_framework import status
+from ...serializers import *
+
+def get_topic_scoreboard(topic:Topic):
+    # Problems of the topic in display order, the columns of the scoreboard
+    problems = CollectionProblem.objects.filter(
+        collection__topiccollection__topic=topic
+    ).order_by('collection__topiccollection__order','order').values_list('problem_id','problem__title')
+
+    columns = []
+    seen = set()
+    for problem_id,title in problems:
+        if problem_id not in seen:
+            seen.add(problem_id)
+            columns.append({"problem_id": problem_id,"title": title})
+
+    # Read from the materialized progress only, nothing is recomputed from submissions
+    progresses = TopicProgress.objects.filter(topic=topic).select_related('account').order_by('-total_score','-passed_problems','updated_date')
+    scoreboard = [{
+        "account": AccountSecureSerializer(progress.account).data,
+        "total_score": progress.total_score,
+        "passed_problems": progress.passed_problems,
+        "updated_date": progress.updated_date,
+        "problems": progress.problems
+    } for progress in progresses]
+
+    return Response({
+        "topic_id": topic.topic_id,
+        "problems": columns,
+        "scoreboard": scoreboard
+    },status=status.HTTP_200_OK)
@@ -7,6 +7,7 @@ from ...models import *
 from rest_framework import status
 from django.forms.models import model_to_dict
 from ...serializers import *
+from ...permissions.effective import invalidate_effective_permissions
 
 def update_groups_permission_to_topic(topic:Topic,request):
 
@@ -24,6 +25,8 @@ def update_groups_permission_to_topic(topic:Topic,request):
         ))
 
     TopicGroupPermission.objects.bulk_create(topic_group_permissions)
+    # bulk_create sends no post_save
+    invalidate_effective_permissions()
 
     topic.group_permissions = topic_group_permissions
     serialize = TopicPopulateTopicGroupPermissionsSerializer(topic)
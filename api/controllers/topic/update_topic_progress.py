@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.utils import timezone
+from ...models import *
+
+def record_topic_progress(submission:Submission):
+    """Fold a graded submission made in a topic into its (topic,account) TopicProgress"""
+    if not submission.topic_id:
+        return
+    with transaction.atomic():
+        progress,_ = TopicProgress.objects.select_for_update().get_or_create(topic_id=submission.topic_id,account_id=submission.account_id)
+        if progress.problems.get(submission.problem_id,-1) >= submission.passed_ratio:
+            return
+        progress.problems[submission.problem_id] = submission.passed_ratio
+        progress.total_score = sum(progress.problems.values())
+        progress.passed_problems = len([ratio for ratio in progress.problems.values() if ratio == 1])
+        progress.updated_date = timezone.now()
+        progress.save()
@@ -1,16 +1,47 @@
+import logging
+import threading
+from django.conf import settings
 
-# try:
-#     import pickle
-#     with open('./api/difficulty_predictor/difficulty_predictor_667.sav', 'rb') as f:
-#         difficulty = pickle.load(f)
-# except:
-#     print("Error during loading difficulty_predictor_667.sav")
-#     difficulty = None
-#     pass
-
-# Predict some model
-	
-def predict(avg_first_passed_total_attempts,avg_first_passed_time_used):
-    # if not difficulty:
-    #     return 0
-    return 0 # int(difficulty.predict([[avg_first_passed_total_attempts,avg_first_passed_time_used]])[0])
\ No newline at end of file
+logger = logging.getLogger(__name__)
+
+# The model is loaded on the first prediction and kept for the life of the
+# process. Without it (file missing, scikit-learn not installed) every
+# difficulty is 0.
+model = None
+model_loaded = False
+model_lock = threading.Lock()
+
+def load_model():
+    global model,model_loaded
+    if model_loaded:
+        return model
+    with model_lock:
+        if not model_loaded:
+            try:
+                import joblib
+                # Arrays stored by joblib.dump are memory-mapped and shared between workers
+                model = joblib.load(settings.DIFFICULTY_MODEL_PATH,mmap_mode='r')
+            except Exception:
+                logger.exception("Error during loading %s, difficulties default to 0",settings.DIFFICULTY_MODEL_PATH)
+                model = None
+            model_loaded = True
+    return model
+
+def predict_many(features) -> list[int]:
+    """Difficulty of each [avg_first_passed_total_attempts,avg_first_passed_time_used] row of features, in one model call"""
+    import numpy as np
+
+    features = np.asarray(features,dtype=float).reshape(-1,2)
+    difficulties = np.zeros(len(features),dtype=int)
+
+    # Rows with a missing feature (no submission statistics) stay 0
+    valid = np.isfinite(features).all(axis=1)
+    model = load_model()
+    if model is None or not valid.any():
+        return difficulties.tolist()
+
+    difficulties[valid] = model.predict(features[valid])
+    return difficulties.tolist()
+
+def predict(avg_first_passed_total_attempts,avg_first_passed_time_used) -> int:
+    return predict_many([[avg_first_passed_total_attempts,avg_first_passed_time_used]])[0]
@@ -1,57 +1,49 @@
-try:
-    import pandas as pd
-    pd.options.mode.chained_assignment = None
-    success = True
-except:
-    success = False
-
-def modelgrader_preprocessor(submission_df):
-
-    if not success:
-        return [-1,-1]
-
-    submission_df = submission_df[['account_id', 'problem_id','is_passed','language','date','submission_code','passed_ratio']]
+# pandas is imported on first use, web workers that never compute a
+# difficulty don't pay its import time and memory
+pd = None
+
+def import_pandas():
+    """The pandas module, or None when it is not installed"""
+    global pd
+    if pd is None:
+        try:
+            import pandas
+            pandas.options.mode.chained_assignment = None
+            pd = pandas
+        except ImportError:
+            return None
+    return pd
+
+# Gaps between attempts longer than MAX_TIME_GAP count as CAPPED_TIME_GAP (Second)
+MAX_TIME_GAP = 10800
+CAPPED_TIME_GAP = 10801
+
+PREPROCESSOR_COLUMNS = ['account_id','problem_id','is_passed','date']
+
+def modelgrader_features(submission_df):
+    """
+    DataFrame of avg_first_passed_total_attempts and avg_first_passed_time_used indexed by problem_id.
+    Per account, only the submissions up to and including its first passed one are counted.
+    """
+
+    import_pandas()
+
+    # submission_code and the other columns are not needed
+    submission_df = submission_df[PREPROCESSOR_COLUMNS]
+    submission_df['date'] = pd.to_datetime(submission_df['date'])
+    submission_df['is_passed'] = submission_df['is_passed'].astype(int)
 
-    # Change submission_code to string
-    submission_df['submission_code'] = submission_df['submission_code'].astype(str)
-    
     # Sort by account_id, problem_id and date
-    submission_df.sort_values(['account_id','problem_id','date'])
+    submission_df = submission_df.sort_values(['account_id','problem_id','date'],kind='stable')
+    group = submission_df.groupby(['account_id','problem_id'],sort=False)
 
     # Calculate the difference time between the current submission and the previous submission
-    submission_df['date'] = pd.to_datetime(submission_df['date'])
-    submission_df['diff_time'] = submission_df.groupby(['account_id','problem_id'])['date'].diff()
-    submission_df['diff_time'] = submission_df['diff_time'].dt.total_seconds()
-
-    # Set all diff_time which is NaN to 0
-    submission_df['diff_time'].fillna(0, inplace=True)
-
-    # Set all diff_time which has more than 3 hours to 3
-    submission_df.loc[submission_df['diff_time'] > 10800, 'diff_time'] = 10801
-
-    # Loop each row
-    current_problem_id = None
-    current_account_id = None
-    already_passed = False
-    previous_diff_time = -1
-
-
-    for index, row in submission_df.iterrows():
-        if not current_problem_id and not current_account_id:
-            current_problem_id = row['problem_id']
-            current_account_id = row['account_id']
-
-        if current_problem_id != row['problem_id'] or current_account_id != row['account_id']:
-            current_problem_id = row['problem_id']
-            current_account_id = row['account_id']
-            already_passed = False
-        elif already_passed:
-            # row['diff_time'] = 0
-            submission_df.drop(index, inplace=True)
-        elif row['is_passed'] == 1:
-            already_passed = True
-            if row['diff_time'] > 10800:
-                row['diff_time'] = previous_diff_time
+    submission_df['diff_time'] = group['date'].diff().dt.total_seconds().fillna(0)
+    submission_df.loc[submission_df['diff_time'] > MAX_TIME_GAP,'diff_time'] = CAPPED_TIME_GAP
+
+    # Drop the submissions after the first passed one
+    passed_before = group['is_passed'].cumsum() - submission_df['is_passed']
+    submission_df = submission_df[passed_before == 0]
 
     grouped_submission_df = submission_df.groupby(['account_id','problem_id']).agg({'is_passed':'sum','date':'count','diff_time':'sum'}).reset_index()
 
@@ -68,4 +60,14 @@ def modelgrader_preprocessor(submission_df):
     # Change problem_id to index
     df.set_index('problem_id', inplace=True)
 
-    return [df['avg_first_passed_total_attempts'][0],df['avg_first_passed_time_used'][0]]
\ No newline at end of file
+    return df
+
+def modelgrader_preprocessor(submission_df):
+    """[avg_first_passed_total_attempts,avg_first_passed_time_used] of the (first) problem in submission_df"""
+
+    if import_pandas() is None:
+        return [-1,-1]
+
+    df = modelgrader_features(submission_df)
+
+    return [df['avg_first_passed_total_attempts'].iloc[0],df['avg_first_passed_time_used'].iloc[0]]
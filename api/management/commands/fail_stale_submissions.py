@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.controllers.submission.submit_problem import fail_stale_submissions
+
+class Command(BaseCommand):
+    help = "Mark asynchronous submissions left PENDING/GRADING by a previous server as ERROR, run before the server starts"
+
+    def add_arguments(self,parser):
+        parser.add_argument('--max-age',type=float,default=settings.GRADER_STALE_SUBMISSION_AGE,help="Only submissions older than this many seconds")
+
+    def handle(self,*args,**options):
+        failed = fail_stale_submissions(options['max_age'])
+        self.stdout.write(f"Marked {failed} stale submission(s) as ERROR")
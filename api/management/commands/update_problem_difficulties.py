@@ -0,0 +1,14 @@
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from api.controllers.script.update_all_problem_difficulties import recompute_all_problem_difficulties
+
+class Command(BaseCommand):
+    help = "Recompute the difficulty of every problem from all submissions in one pass"
+
+    def add_arguments(self,parser):
+        parser.add_argument('--batch-size',type=int,default=1000,help="Rows per bulk_update statement")
+
+    def handle(self,*args,**options):
+        start = perf_counter()
+        updated = recompute_all_problem_difficulties(options['batch_size'])
+        self.stdout.write(f"Updated {updated} problem(s) in {perf_counter()-start:.2f}s")
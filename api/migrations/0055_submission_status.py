@@ -0,0 +1,18 @@
+# Generated by Django 4.1.2 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0054_problem_pdf_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='status',
+            field=models.CharField(default='DONE', max_length=10),
+        ),
+    ]
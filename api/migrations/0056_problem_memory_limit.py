@@ -0,0 +1,18 @@
+# Generated by Django 4.1.2 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0055_submission_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='memory_limit',
+            field=models.IntegerField(blank=True, default=256),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.2 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0057_submission_usage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='fail_fast',
+            field=models.BooleanField(blank=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='max_consecutive_timeouts',
+            field=models.IntegerField(blank=True, default=0),
+        ),
+    ]
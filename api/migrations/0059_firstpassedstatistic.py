@@ -0,0 +1,61 @@
+# Generated by Django 4.1.2 on 2026-10-18 15:20
+
+import api.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+MAX_TIME_GAP = 10800
+CAPPED_TIME_GAP = 10801
+
+
+def backfill_first_passed_statistics(apps, schema_editor):
+    Submission = apps.get_model('api', 'Submission')
+    FirstPassedStatistic = apps.get_model('api', 'FirstPassedStatistic')
+
+    statistics = {}
+    submissions = Submission.objects.order_by('problem_id', 'account_id', 'date').values_list('problem_id', 'account_id', 'date', 'is_passed')
+    for problem_id, account_id, date, is_passed in submissions.iterator():
+        statistic = statistics.get((problem_id, account_id))
+        if statistic is None:
+            statistic = statistics[(problem_id, account_id)] = FirstPassedStatistic(
+                first_passed_statistic_id=api.models.generate_uuid4_hex(),
+                problem_id=problem_id,
+                account_id=account_id,
+            )
+        if statistic.is_passed:
+            continue
+        if statistic.last_date:
+            gap = max(0, (date - statistic.last_date).total_seconds())
+            statistic.time_used += CAPPED_TIME_GAP if gap > MAX_TIME_GAP else gap
+        statistic.total_attempts += 1
+        statistic.last_date = date
+        statistic.is_passed = is_passed
+
+    FirstPassedStatistic.objects.bulk_create(statistics.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0058_problem_fail_fast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FirstPassedStatistic',
+            fields=[
+                ('first_passed_statistic_id', models.CharField(blank=True, default=api.models.generate_uuid4_hex, max_length=32, primary_key=True, serialize=False)),
+                ('total_attempts', models.IntegerField(default=0)),
+                ('time_used', models.FloatField(default=0)),
+                ('last_date', models.DateTimeField(null=True)),
+                ('is_passed', models.BooleanField(default=False)),
+                ('account', models.ForeignKey(db_column='account_id', on_delete=django.db.models.deletion.CASCADE, to='api.account')),
+                ('problem', models.ForeignKey(db_column='problem_id', on_delete=django.db.models.deletion.CASCADE, to='api.problem')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='firstpassedstatistic',
+            constraint=models.UniqueConstraint(fields=('problem', 'account'), name='unique_first_passed_statistic'),
+        ),
+        migrations.RunPython(backfill_first_passed_statistics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.1.2 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0059_firstpassedstatistic'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testcase',
+            index=models.Index(fields=['problem', 'deprecated'], name='testcase_problem_deprecated'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['account', 'problem', 'topic', 'date'], name='submission_acc_prob_topic_date'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['account', 'problem', 'passed_ratio', 'date'], name='submission_acc_prob_ratio_date'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['problem', 'date'], name='submission_problem_date'),
+        ),
+        migrations.AddIndex(
+            model_name='bestsubmission',
+            index=models.Index(fields=['account', 'problem', 'topic'], name='best_submission_acc_prob_topic'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.2 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0060_submission_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['date', 'submission_id'], name='submission_date_id'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.1.2 on 2026-10-18 17:05
+
+import api.models
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def backfill_daily_submission_counts(apps, schema_editor):
+    Submission = apps.get_model('api', 'Submission')
+    DailySubmissionCount = apps.get_model('api', 'DailySubmissionCount')
+
+    counts = Submission.objects.annotate(day=TruncDate('date')).values('account_id', 'day').annotate(count=Count('submission_id')).order_by()
+    DailySubmissionCount.objects.bulk_create((
+        DailySubmissionCount(
+            daily_submission_count_id=api.models.generate_uuid4_hex(),
+            account_id=row['account_id'],
+            date=row['day'],
+            count=row['count'],
+        ) for row in counts.iterator()
+    ), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0061_submission_date_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySubmissionCount',
+            fields=[
+                ('daily_submission_count_id', models.CharField(blank=True, default=api.models.generate_uuid4_hex, max_length=32, primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('account', models.ForeignKey(db_column='account_id', on_delete=django.db.models.deletion.CASCADE, to='api.account')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailysubmissioncount',
+            constraint=models.UniqueConstraint(fields=('account', 'date'), name='unique_daily_submission_count'),
+        ),
+        migrations.RunPython(backfill_daily_submission_counts, migrations.RunPython.noop),
+    ]
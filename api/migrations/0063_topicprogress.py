@@ -0,0 +1,55 @@
+# Generated by Django 4.1.2 on 2026-10-18 17:40
+
+import api.models
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_topic_progress(apps, schema_editor):
+    BestSubmission = apps.get_model('api', 'BestSubmission')
+    TopicProgress = apps.get_model('api', 'TopicProgress')
+
+    progresses = {}
+    best_submissions = BestSubmission.objects.filter(topic__isnull=False).values_list('topic_id', 'account_id', 'problem_id', 'submission__passed_ratio')
+    for topic_id, account_id, problem_id, passed_ratio in best_submissions.iterator():
+        problems = progresses.setdefault((topic_id, account_id), {})
+        problems[problem_id] = max(problems.get(problem_id, 0), passed_ratio)
+
+    TopicProgress.objects.bulk_create((
+        TopicProgress(
+            topic_progress_id=api.models.generate_uuid4_hex(),
+            topic_id=topic_id,
+            account_id=account_id,
+            problems=problems,
+            total_score=sum(problems.values()),
+            passed_problems=len([ratio for ratio in problems.values() if ratio == 1]),
+        ) for (topic_id, account_id), problems in progresses.items()
+    ), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0062_dailysubmissioncount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopicProgress',
+            fields=[
+                ('topic_progress_id', models.CharField(blank=True, default=api.models.generate_uuid4_hex, max_length=32, primary_key=True, serialize=False)),
+                ('problems', models.JSONField(default=dict)),
+                ('total_score', models.FloatField(default=0)),
+                ('passed_problems', models.IntegerField(default=0)),
+                ('updated_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('account', models.ForeignKey(db_column='account_id', on_delete=django.db.models.deletion.CASCADE, to='api.account')),
+                ('topic', models.ForeignKey(db_column='topic_id', on_delete=django.db.models.deletion.CASCADE, to='api.topic')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='topicprogress',
+            constraint=models.UniqueConstraint(fields=('topic', 'account'), name='unique_topic_progress'),
+        ),
+        migrations.RunPython(backfill_topic_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.1.2 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+def deduplicate_best_submissions(apps, schema_editor):
+    BestSubmission = apps.get_model('api', 'BestSubmission')
+
+    # Keep the best submission of each (problem,account,topic), the newer one on a tie
+    kept = set()
+    duplicates = []
+    best_submissions = BestSubmission.objects.order_by(
+        'problem_id', 'account_id', 'topic_id', '-submission__passed_ratio', '-submission__date'
+    ).values_list('best_submission_id', 'problem_id', 'account_id', 'topic_id')
+    for best_submission_id, problem_id, account_id, topic_id in best_submissions.iterator():
+        if (problem_id, account_id, topic_id) in kept:
+            duplicates.append(best_submission_id)
+        else:
+            kept.add((problem_id, account_id, topic_id))
+    for i in range(0, len(duplicates), 500):
+        BestSubmission.objects.filter(best_submission_id__in=duplicates[i:i+500]).delete()
+
+    BestSubmission.objects.update(passed_ratio=models.Subquery(
+        apps.get_model('api', 'Submission').objects.filter(submission_id=models.OuterRef('submission_id')).values('passed_ratio')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0063_topicprogress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bestsubmission',
+            name='passed_ratio',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(deduplicate_best_submissions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='bestsubmission',
+            constraint=models.UniqueConstraint(condition=models.Q(('topic__isnull', False)), fields=('problem', 'account', 'topic'), name='unique_best_submission_topic'),
+        ),
+        migrations.AddConstraint(
+            model_name='bestsubmission',
+            constraint=models.UniqueConstraint(condition=models.Q(('topic__isnull', True)), fields=('problem', 'account'), name='unique_best_submission'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.2 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0064_bestsubmission_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submissiontestcase',
+            name='position',
+            field=models.IntegerField(default=0),
+        ),
+    ]
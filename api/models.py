@@ -37,6 +37,10 @@ class Problem(models.Model):
     description = models.CharField(max_length=100000)
     solution = models.CharField(max_length=20000)
     time_limit = models.FloatField(default=1.5,blank=True)
+    memory_limit = models.IntegerField(default=256,blank=True) # (MB)
+    # Fail-fast grading, the remaining testcases of a submission are SKIPPED
+    fail_fast = models.BooleanField(default=False,blank=True) # Stop at the first failed testcase
+    max_consecutive_timeouts = models.IntegerField(default=0,blank=True) # Stop after this many TIMEOUTs in a row, 0 = never
     is_active = models.BooleanField(default=True,blank=True)
     is_private = models.BooleanField(default=False,blank=True)
     submission_regex = models.CharField(max_length=1000,null=True,blank=True,default=".*")
@@ -55,6 +59,11 @@ class Testcase(models.Model):
     runtime_status = models.CharField(max_length=10)
     deprecated = models.BooleanField(default=False,blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['problem','deprecated'],name='testcase_problem_deprecated')
+        ]
+
 class Collection(models.Model):
     collection_id = models.CharField(primary_key=True,blank=True,default=generate_uuid4_hex,max_length=32)
     creator = models.ForeignKey(Account,on_delete=models.CASCADE,db_column="creator_id")
@@ -112,6 +121,21 @@ class Submission(models.Model):
     score = models.IntegerField(default=0)
     max_score = models.IntegerField(default=0)
     passed_ratio = models.FloatField(default=0)
+    status = models.CharField(max_length=10,default="DONE") # PENDING, GRADING, DONE, ERROR
+    wall_time = models.FloatField(null=True,blank=True) # (Second) sum over testcases
+    cpu_time = models.FloatField(null=True,blank=True) # (Second) sum over testcases
+    memory = models.IntegerField(null=True,blank=True) # (KB) max over testcases
+
+    class Meta:
+        # Submissions of an account to a problem (optionally in a topic) newest or best first,
+        # and all submissions of a problem newest first
+        indexes = [
+            models.Index(fields=['account','problem','topic','date'],name='submission_acc_prob_topic_date'),
+            models.Index(fields=['account','problem','passed_ratio','date'],name='submission_acc_prob_ratio_date'),
+            models.Index(fields=['problem','date'],name='submission_problem_date'),
+            # Keyset pagination of the submission log
+            models.Index(fields=['date','submission_id'],name='submission_date_id')
+        ]
 
 class SubmissionTestcase(models.Model):
     submission_testcase_id = models.CharField(primary_key=True,blank=True,default=generate_uuid4_hex,max_length=32)
@@ -120,6 +144,10 @@ class SubmissionTestcase(models.Model):
     output = models.CharField(max_length=100000,blank=True,null=True)
     is_passed = models.BooleanField(default=False,blank=True)
     runtime_status = models.CharField(max_length=10)
+    wall_time = models.FloatField(null=True,blank=True) # (Second)
+    cpu_time = models.FloatField(null=True,blank=True) # (Second) user + sys
+    memory = models.IntegerField(null=True,blank=True) # (KB) max RSS
+    position = models.IntegerField(default=0) # Index of the testcase in the grading order
 
 class BestSubmission(models.Model):
     best_submission_id = models.CharField(primary_key=True,blank=True,default=generate_uuid4_hex,max_length=32)
@@ -127,6 +155,61 @@ class BestSubmission(models.Model):
     topic = models.ForeignKey(Topic,on_delete=models.CASCADE,db_column="topic_id",null=True)
     account = models.ForeignKey(Account,on_delete=models.CASCADE,db_column="account_id")
     submission = models.ForeignKey(Submission,on_delete=models.CASCADE,db_column="submission_id")
+    passed_ratio = models.FloatField(default=0) # Copy of submission.passed_ratio, compared in the upsert
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['account','problem','topic'],name='best_submission_acc_prob_topic')
+        ]
+        # One row per (problem,account,topic), NULL topics are distinct in a plain unique index
+        constraints = [
+            models.UniqueConstraint(fields=['problem','account','topic'],condition=models.Q(topic__isnull=False),name='unique_best_submission_topic'),
+            models.UniqueConstraint(fields=['problem','account'],condition=models.Q(topic__isnull=True),name='unique_best_submission')
+        ]
+
+class FirstPassedStatistic(models.Model):
+    # Submissions of an account to a problem up to and including its first passed one,
+    # kept up to date on each submission for the difficulty predictor
+    first_passed_statistic_id = models.CharField(primary_key=True,blank=True,default=generate_uuid4_hex,max_length=32)
+    problem = models.ForeignKey(Problem,on_delete=models.CASCADE,db_column="problem_id")
+    account = models.ForeignKey(Account,on_delete=models.CASCADE,db_column="account_id")
+    total_attempts = models.IntegerField(default=0)
+    time_used = models.FloatField(default=0) # (Second) between consecutive attempts, each gap capped at 10801
+    last_date = models.DateTimeField(null=True)
+    is_passed = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['problem','account'],name='unique_first_passed_statistic')
+        ]
+
+class TopicProgress(models.Model):
+    # Best passed_ratio of an account for each problem it submitted to in a topic,
+    # kept up to date on each graded submission for the scoreboard
+    topic_progress_id = models.CharField(primary_key=True,blank=True,default=generate_uuid4_hex,max_length=32)
+    topic = models.ForeignKey(Topic,on_delete=models.CASCADE,db_column="topic_id")
+    account = models.ForeignKey(Account,on_delete=models.CASCADE,db_column="account_id")
+    problems = models.JSONField(default=dict) # problem_id -> best passed_ratio
+    total_score = models.FloatField(default=0) # Sum of the best passed_ratios
+    passed_problems = models.IntegerField(default=0)
+    updated_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['topic','account'],name='unique_topic_progress')
+        ]
+
+class DailySubmissionCount(models.Model):
+    # Submissions of an account per day (in TIME_ZONE), kept up to date on each submission for the activity heatmap
+    daily_submission_count_id = models.CharField(primary_key=True,blank=True,default=generate_uuid4_hex,max_length=32)
+    account = models.ForeignKey(Account,on_delete=models.CASCADE,db_column="account_id")
+    date = models.DateField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account','date'],name='unique_daily_submission_count')
+        ]
 
 class Group(models.Model):
     group_id = models.CharField(primary_key=True,blank=True,default=generate_uuid4_hex,max_length=32)
@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from ..models import *
+from ..caches.shared import is_shared_cache
+
+"""
+Effective permissions of an account: the topics, collections and problems
+it can view or manage through the groups it is a member of.
+
+They are computed once and cached under a global version. Any change to
+GroupMember or a *GroupPermission replaces the version (see signals in
+api/apps.py). bulk_create and queryset update() send no signals, so the
+code that uses them calls invalidate_effective_permissions() itself.
+"""
+
+TIMEOUT = 60*60 # (Second)
+VERSION_KEY = 'permissions-version'
+
+class EffectivePermissions:
+    def __init__(self,view_topics:frozenset,manage_topics:frozenset,view_collections:frozenset,manage_collections:frozenset,view_problems:frozenset,manage_problems:frozenset) -> None:
+        # Manage permission implies view permission
+        self.view_topics = view_topics
+        self.manage_topics = manage_topics
+        self.view_collections = view_collections
+        self.manage_collections = manage_collections
+        self.view_problems = view_problems
+        self.manage_problems = manage_problems
+
+def permitted_ids(queryset,id_field:str,view_field:str,manage_field:str) -> tuple[frozenset,frozenset]:
+    rows = queryset.values_list(id_field,view_field,manage_field)
+    view = frozenset([id for id,can_view,can_manage in rows if can_view or can_manage])
+    manage = frozenset([id for id,can_view,can_manage in rows if can_manage])
+    return view,manage
+
+def compute_effective_permissions(account_id:str) -> EffectivePermissions:
+    view_topics,manage_topics = permitted_ids(
+        TopicGroupPermission.objects.filter(group__groupmember__account_id=account_id),
+        'topic_id','permission_view_topics','permission_manage_topics')
+    view_collections,manage_collections = permitted_ids(
+        CollectionGroupPermission.objects.filter(group__groupmember__account_id=account_id),
+        'collection_id','permission_view_collections','permission_manage_collections')
+    view_problems,manage_problems = permitted_ids(
+        ProblemGroupPermission.objects.filter(group__groupmember__account_id=account_id),
+        'problem_id','permission_view_problems','permission_manage_problems')
+    return EffectivePermissions(view_topics,manage_topics,view_collections,manage_collections,view_problems,manage_problems)
+
+def get_version() -> str:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY,generate_uuid4_hex(),None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+def get_effective_permissions(account:Account) -> EffectivePermissions:
+    if not is_shared_cache():
+        # Revoked permissions must not outlive their invalidation on another worker
+        return compute_effective_permissions(account.account_id)
+    key = f'permissions:{account.account_id}:{get_version()}'
+    permissions = cache.get(key)
+    if permissions is None:
+        permissions = compute_effective_permissions(account.account_id)
+        cache.set(key,permissions,TIMEOUT)
+    return permissions
+
+def invalidate_effective_permissions(**kwargs) -> None:
+    """Drop every cached EffectivePermissions, also usable as a signal receiver"""
+    cache.set(VERSION_KEY,generate_uuid4_hex(),None)
@@ -1,6 +1,6 @@
 from ..models import *
+from .effective import get_effective_permissions
+
 def canManageTopic(topic:Topic,account:Account):
-    is_creator = topic.creator.account_id == account.account_id
-    has_permission = len(TopicGroupPermission.objects.filter(permission_manage_topics=True,topic=topic,group__in=[gm.group for gm in GroupMember.objects.filter(account=account)])) > 0
-    print(TopicGroupPermission.objects.filter(topic=topic,group__in=[gm.group for gm in GroupMember.objects.filter(account=account)]))
-    return is_creator or has_permission
\ No newline at end of file
+    is_creator = topic.creator_id == account.account_id
+    return is_creator or topic.topic_id in get_effective_permissions(account).manage_topics
@@ -0,0 +1,111 @@
+import os
+import signal
+import hashlib
+import subprocess
+import tempfile
+from time import time
+from django.conf import settings
+from .container import sandbox_command,cpu_time_limit_for
+
+class CompileCache:
+    """
+    Content-addressed store of compiled binaries.
+
+    An entry is keyed by sha256 of (language, compiler command, source code)
+    so identical sources are only compiled once. Hits refresh the file mtime
+    and the least recently used binaries are removed once the directory
+    grows past max_size bytes.
+
+    The compiler runs under the sandbox limits: memory_limit bytes of address
+    space per process, at most timeout seconds and write_limit bytes per file.
+    """
+
+    # Entries used more recently than this are never evicted, they may be
+    # about to be executed by another grader.
+    EVICTION_GRACE = 60 # (Second)
+
+    def __init__(self,path:str,max_size:int,timeout:float,memory_limit:int,write_limit:int) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.write_limit = write_limit
+
+    def key(self,language:str,command:list[str],code:str) -> str:
+        digest = hashlib.sha256()
+        digest.update(language.encode())
+        digest.update(b'\0')
+        digest.update('\0'.join(command).encode())
+        digest.update(b'\0')
+        digest.update(code.encode())
+        return digest.hexdigest()
+
+    def get_or_compile(self,language:str,command:list[str],extension:str,code:str) -> str:
+        """Return the path of the compiled code, compiling it with command on a miss."""
+        binary = os.path.join(self.path,f'{self.key(language,command,code)}.exe')
+        try:
+            os.utime(binary)
+            return binary
+        except FileNotFoundError:
+            pass
+
+        os.makedirs(self.path,exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=self.path) as workspace:
+            source = os.path.join(workspace,f'runner.{extension}')
+            output = os.path.join(workspace,'runner.exe')
+            with open(source,'w') as f:
+                f.write(code)
+            self.compile([*command,source,'-o',output])
+            os.replace(output,binary)
+
+        self.evict()
+        return binary
+
+    def compile(self,command:list[str]) -> None:
+        """Run the compiler, raising CalledProcessError on failure and TimeoutExpired past the timeout."""
+        # A session of its own, so cc1/as/ld are killed with the driver on timeout
+        process = subprocess.Popen(
+            sandbox_command(command,self.memory_limit,cpu_time_limit_for(self.timeout),self.write_limit),
+            stdout=subprocess.DEVNULL,stderr=subprocess.DEVNULL,start_new_session=True)
+        try:
+            returncode = process.wait(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid,signal.SIGKILL)
+            process.wait()
+            raise
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode,command)
+
+    def evict(self) -> None:
+        entries = []
+        total = 0
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if not entry.name.endswith('.exe'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime,stat.st_size,entry.path))
+                total += stat.st_size
+
+        now = time()
+        for mtime,size,path in sorted(entries):
+            if total <= self.max_size:
+                break
+            if now-mtime < self.EVICTION_GRACE:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+compile_cache = CompileCache(
+    settings.GRADER_COMPILE_CACHE_DIR,
+    settings.GRADER_COMPILE_CACHE_SIZE,
+    settings.GRADER_COMPILE_TIMEOUT,
+    settings.GRADER_COMPILE_MEMORY_LIMIT,
+    settings.GRADER_COMPILE_WRITE_LIMIT
+)
@@ -1,14 +1,29 @@
+import os
 import sys
+import shutil
+import signal
 import resource
-import pyseccomp as seccomp
+import selectors
+import subprocess
+from time import monotonic, sleep
+try:
+    import pyseccomp as seccomp
+except ImportError:
+    seccomp = None
 
 
-MEMORY_LIMIT = 64 * 1024 * 1024  # 64kb
+MEMORY_LIMIT = 256 * 1024 * 1024  # 256mb
 CPU_TIME_LIMIT = 1  # 1sec
 WRITE_LIMIT = 512  # 512bytes
+OUTPUT_LIMIT = 100000  # 100kb, the size of Testcase.output
+
+PRLIMIT = shutil.which('prlimit')
 
 
 def drop_perms():
+    if seccomp is None:
+        return
+
     # respond with EPERM: operation not permitted so users can tell
     # they're being blocked from doing something
     filter = seccomp.SyscallFilter(seccomp.ERRNO(seccomp.errno.EPERM))
@@ -25,17 +40,166 @@ def drop_perms():
     filter.load()
 
 
-def set_mem_limit():
+def set_mem_limit(memory_limit=MEMORY_LIMIT, cpu_time_limit=CPU_TIME_LIMIT, write_limit=WRITE_LIMIT):
     # virtual memory
-    resource.setrlimit(resource.RLIMIT_AS, (MEMORY_LIMIT, MEMORY_LIMIT))
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
     # cpu time
-    resource.setrlimit(resource.RLIMIT_CPU, (CPU_TIME_LIMIT, CPU_TIME_LIMIT))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_time_limit, cpu_time_limit))
     # write limit i.e. don't allow an infinite stream to stdout/stderr
-    resource.setrlimit(resource.RLIMIT_FSIZE, (WRITE_LIMIT, WRITE_LIMIT))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (write_limit, write_limit))
+
+
+def cpu_time_limit_for(timeout: float) -> int:
+    # Leave the wall clock timeout to fire first, RLIMIT_CPU is the backstop
+    return int(timeout) + 2
+
+
+def sandbox_command(command, memory_limit=MEMORY_LIMIT, cpu_time_limit=CPU_TIME_LIMIT, write_limit=WRITE_LIMIT):
+    """
+    Wrap command so it starts with the limits applied, without a preexec_fn
+    (which is unsafe in the threaded web process). prlimit execs the command
+    in place; without it this module is used as a launcher.
+    """
+    if PRLIMIT:
+        return [PRLIMIT, f"--as={memory_limit}", f"--cpu={cpu_time_limit}", f"--fsize={write_limit}", "--", *command]
+    return [sys.executable, os.path.abspath(__file__), str(memory_limit), str(cpu_time_limit), str(write_limit), *command]
+
+
+def communicate(stdin_fd, stdout_fd, input: bytes, deadline: float, kill, output_limit=OUTPUT_LIMIT):
+    """
+    Feed input to stdin_fd and read stdout_fd until EOF, the deadline (a
+    time.monotonic() value) or output_limit bytes, closing both descriptors.
+    kill() is called to stop the program on timeout or too much output.
+    Returns (output, timed_out, truncated); output holds at most output_limit bytes.
+    """
+    output = bytearray()
+    timed_out = False
+    truncated = False
+    pending = memoryview(input)
+    with selectors.DefaultSelector() as selector:
+        # Input is written from the same loop (no feeder thread), a thread
+        # would leave a malloc arena behind in the fork-server's address space
+        if pending:
+            os.set_blocking(stdin_fd, False)
+            selector.register(stdin_fd, selectors.EVENT_WRITE)
+        else:
+            os.close(stdin_fd)
+            stdin_fd = None
+        selector.register(stdout_fd, selectors.EVENT_READ)
+        while True:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            events = selector.select(remaining)
+            if any(key.fd == stdout_fd for key, _ in events):
+                chunk = os.read(stdout_fd, 65536)
+                if not chunk:
+                    break
+                output += chunk
+                if len(output) > output_limit:
+                    del output[output_limit:]
+                    truncated = True
+                    break
+            if stdin_fd is not None and any(key.fd == stdin_fd for key, _ in events):
+                try:
+                    pending = pending[os.write(stdin_fd, pending[:65536]):]
+                except BlockingIOError:
+                    pass
+                except BrokenPipeError:
+                    # The program stopped reading, the rest of the input is dropped
+                    pending = pending[:0]
+                if not pending:
+                    selector.unregister(stdin_fd)
+                    os.close(stdin_fd)
+                    stdin_fd = None
+    if stdin_fd is not None:
+        os.close(stdin_fd)
+    os.close(stdout_fd)
+    if timed_out or truncated:
+        kill()
+    return bytes(output), timed_out, truncated
+
+
+def wait_until(pid, deadline: float, kill):
+    """
+    Reap pid, calling kill() once the deadline (a time.monotonic() value)
+    passes. A program can close its stdout and keep running, so the end of
+    its output is not the end of the wall clock limit.
+    Returns (wait_status, rusage, timed_out).
+    """
+    delay = 0.001
+    while True:
+        reaped, wait_status, rusage = os.wait4(pid, os.WNOHANG)
+        if reaped:
+            return wait_status, rusage, False
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            kill()
+            _, wait_status, rusage = os.wait4(pid, 0)
+            return wait_status, rusage, True
+        sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.05)
+
+
+def runtime_status_of(wait_status: int, timed_out: bool) -> str:
+    # RLIMIT_CPU ends the child with SIGXCPU (or SIGKILL at the hard limit)
+    # when its CPU time runs out before the wall clock timeout does
+    if timed_out or (os.WIFSIGNALED(wait_status) and os.WTERMSIG(wait_status) in (signal.SIGXCPU, signal.SIGKILL)):
+        return "TIMEOUT"
+    if os.waitstatus_to_exitcode(wait_status) != 0:
+        return "ERROR"
+    return "OK"
+
+
+def resource_usage(rusage, wall_time: float) -> dict:
+    # ru_maxrss is in kilobytes on Linux
+    return {
+        "wall_time": wall_time,
+        "cpu_time": rusage.ru_utime + rusage.ru_stime,
+        "memory": rusage.ru_maxrss,
+    }
+
+
+def run_sandboxed(command, input: bytes, timeout: float, cwd=None, memory_limit=MEMORY_LIMIT, output_limit=OUTPUT_LIMIT):
+    """
+    Run command under the sandbox limits and return (runtime_status, output, usage)
+    where usage is the resource_usage() of the program.
+    Output past output_limit is cut off and the program is stopped there.
+    """
+    stdin_r, stdin_w = os.pipe()
+    stdout_r, stdout_w = os.pipe()
+    start = monotonic()
+    try:
+        process = subprocess.Popen(
+            sandbox_command(command, memory_limit, cpu_time_limit_for(timeout)),
+            stdin=stdin_r, stdout=stdout_w, stderr=subprocess.DEVNULL, cwd=cwd)
+    except BaseException:
+        for fd in (stdin_r, stdin_w, stdout_r, stdout_w):
+            os.close(fd)
+        raise
+    os.close(stdin_r)
+    os.close(stdout_w)
+
+    output, timed_out, truncated = communicate(stdin_w, stdout_r, input, start + timeout, process.kill, output_limit)
+    # prlimit execs the program in place, so the rusage is the program's own
+    if timed_out or truncated:
+        _, wait_status, rusage = os.wait4(process.pid, 0)
+    else:
+        wait_status, rusage, timed_out = wait_until(process.pid, start + timeout, process.kill)
+    usage = resource_usage(rusage, monotonic() - start)
+    process.returncode = os.waitstatus_to_exitcode(wait_status)
+
+    if truncated:
+        # Stopped by us for writing too much, keep what it printed so far
+        return "OK", output, usage
+    runtime_status = runtime_status_of(wait_status, timed_out)
+    return runtime_status, output if runtime_status == "OK" else None, usage
 
 
 if __name__ == "__main__":
-    code = sys.argv[1]
-    set_mem_limit()
-    drop_perms()
-    exec(code)
\ No newline at end of file
+    # Launcher used when prlimit is not installed:
+    # container.py <memory_limit> <cpu_time_limit> <write_limit> <command...>
+    memory_limit, cpu_time_limit, write_limit = map(int, sys.argv[1:4])
+    set_mem_limit(memory_limit, cpu_time_limit, write_limit)
+    os.execvp(sys.argv[4], sys.argv[4:])
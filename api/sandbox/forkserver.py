@@ -0,0 +1,223 @@
+import os
+import sys
+import json
+import queue
+import signal
+import struct
+import subprocess
+from time import monotonic
+from contextlib import contextmanager
+from api.sandbox.container import set_mem_limit,communicate,runtime_status_of,resource_usage,run_sandboxed,wait_until,cpu_time_limit_for,MEMORY_LIMIT,OUTPUT_LIMIT
+
+"""
+Fork-server for Python submissions.
+
+Starting a fresh interpreter costs tens of milliseconds, which dominates
+when testcases are tiny. A fork-server is a warmed-up interpreter that
+forks a child per testcase; the child applies the sandbox limits and
+execs the user code in a fresh __main__ namespace.
+
+The server also launches other programs (compiled binaries, spawned
+interpreters) when the request carries a "command" instead of "code".
+A process keeps the peak RSS of the process it was exec'd from, so
+launching from this small server rather than the web process keeps the
+measured memory close to the program's own.
+
+The server talks to the grader over its stdin/stdout with length-prefixed
+JSON frames:
+    request:  {"code": str, "input": str, "timeout": float, "cwd": str,
+               "memory_limit": int, "output_limit": int}
+              or with "command": list[str] in place of "code"
+    response: {"runtime_status": "OK"|"ERROR"|"TIMEOUT", "output": str|None,
+               "usage": {"wall_time": float, "cpu_time": float, "memory": int}}
+Output bytes are carried as latin-1 so they survive the JSON round trip.
+
+Run the server with `python -m api.sandbox.forkserver` from the project root.
+"""
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Modules imported once by the server so user code finds them in sys.modules
+PRELOAD_MODULES = ['math','random','string','collections','itertools','functools','re','heapq','bisect','json']
+
+def read_frame(stream):
+    header = stream.read(4)
+    if len(header) < 4:
+        return None
+    (length,) = struct.unpack('>I',header)
+    return json.loads(stream.read(length))
+
+def write_frame(stream,frame:dict) -> None:
+    data = json.dumps(frame).encode()
+    stream.write(struct.pack('>I',len(data)) + data)
+    stream.flush()
+
+# Server
+
+def run_child(code,stdin_fd:int,stdout_fd:int,request:dict) -> None:
+    """Body of the forked child, never returns."""
+    exit_code = 0
+    try:
+        os.dup2(stdin_fd,0)
+        os.dup2(stdout_fd,1)
+        devnull = os.open(os.devnull,os.O_WRONLY)
+        os.dup2(devnull,2)
+        os.close(stdin_fd)
+        os.close(stdout_fd)
+        os.close(devnull)
+        if request.get('cwd'):
+            os.chdir(request['cwd'])
+
+        set_mem_limit(request.get('memory_limit',MEMORY_LIMIT),cpu_time_limit_for(float(request['timeout'])))
+
+        sys.stdin = open(0,'r',closefd=False)
+        sys.stdout = open(1,'w',closefd=False)
+        sys.stderr = open(2,'w',closefd=False)
+        # Same argv and globals as `python <workspace>/runner.py`
+        runner = os.path.join(os.getcwd(),'runner.py')
+        sys.argv = [runner]
+        sys.path[0] = os.path.dirname(runner)
+        if 'random' in sys.modules:
+            # Children would otherwise all share the server's random state
+            sys.modules['random'].seed()
+
+        exec(code,{'__name__':'__main__','__file__':runner,'__builtins__':__builtins__})
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code,int):
+            exit_code = e.code
+        else:
+            exit_code = 1
+    except BaseException:
+        exit_code = 1
+    try:
+        sys.stdout.flush()
+    except BaseException:
+        exit_code = exit_code or 1
+    os._exit(exit_code)
+
+def run_command(request:dict) -> dict:
+    runtime_status,output,usage = run_sandboxed(
+        request['command'],request['input'].encode(),float(request['timeout']),request.get('cwd'),
+        request.get('memory_limit',MEMORY_LIMIT),request.get('output_limit',OUTPUT_LIMIT))
+    return {'runtime_status': runtime_status,'output': output.decode('latin-1') if output is not None else None,'usage': usage}
+
+def run_request(request:dict,compiled:dict) -> dict:
+    if request.get('command'):
+        return run_command(request)
+    source = request['code']
+    if compiled.get('source') != source:
+        try:
+            compiled['code'] = compile(source,'runner.py','exec')
+        except (SyntaxError,ValueError):
+            compiled['code'] = None
+        compiled['source'] = source
+    if compiled['code'] is None:
+        return {'runtime_status': 'ERROR','output': None,'usage': None}
+
+    stdin_r,stdin_w = os.pipe()
+    stdout_r,stdout_w = os.pipe()
+    start = monotonic()
+    pid = os.fork()
+    if pid == 0:
+        os.close(stdin_w)
+        os.close(stdout_r)
+        run_child(compiled['code'],stdin_r,stdout_w,request)
+    os.close(stdin_r)
+    os.close(stdout_w)
+
+    deadline = start+float(request['timeout'])
+    kill = lambda: os.kill(pid,signal.SIGKILL)
+    output,timed_out,truncated = communicate(
+        stdin_w,stdout_r,request['input'].encode(),deadline,kill,request.get('output_limit',OUTPUT_LIMIT))
+    # The child's max RSS includes the pages it shares with the warm server
+    if timed_out or truncated:
+        _,wait_status,rusage = os.wait4(pid,0)
+    else:
+        wait_status,rusage,timed_out = wait_until(pid,deadline,kill)
+    usage = resource_usage(rusage,monotonic()-start)
+
+    if truncated:
+        return {'runtime_status': 'OK','output': output.decode('latin-1'),'usage': usage}
+    runtime_status = runtime_status_of(wait_status,timed_out)
+    if runtime_status != "OK":
+        return {'runtime_status': runtime_status,'output': None,'usage': usage}
+    return {'runtime_status': 'OK','output': output.decode('latin-1'),'usage': usage}
+
+def serve() -> None:
+    for module in PRELOAD_MODULES:
+        __import__(module)
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+    compiled = {}
+    while True:
+        request = read_frame(stdin)
+        if request is None:
+            return
+        write_frame(stdout,run_request(request,compiled))
+
+# Client
+
+class ForkServer:
+    def __init__(self) -> None:
+        self.process = subprocess.Popen(
+            ['python','-m','api.sandbox.forkserver'],
+            stdin=subprocess.PIPE,stdout=subprocess.PIPE,stderr=subprocess.DEVNULL,cwd=PROJECT_PATH)
+
+    def run(self,code:str,input:str,timeout:float,cwd:str=None,memory_limit:int=MEMORY_LIMIT,output_limit:int=OUTPUT_LIMIT) -> tuple[str,bytes,dict]:
+        """Run Python code in a forked child, returns (runtime_status,output,usage)."""
+        return self.request({
+            'code': code,'input': input,'timeout': timeout,'cwd': cwd,
+            'memory_limit': memory_limit,'output_limit': output_limit
+        })
+
+    def spawn(self,command:list[str],input:str,timeout:float,cwd:str=None,memory_limit:int=MEMORY_LIMIT,output_limit:int=OUTPUT_LIMIT) -> tuple[str,bytes,dict]:
+        """Run command under the sandbox limits, returns (runtime_status,output,usage)."""
+        return self.request({
+            'command': command,'input': input,'timeout': timeout,'cwd': cwd,
+            'memory_limit': memory_limit,'output_limit': output_limit
+        })
+
+    def request(self,request:dict) -> tuple[str,bytes,dict]:
+        write_frame(self.process.stdin,request)
+        response = read_frame(self.process.stdout)
+        if response is None:
+            raise RuntimeError("Fork-server exited unexpectedly")
+        output = response['output'].encode('latin-1') if response['output'] is not None else None
+        return response['runtime_status'],output,response['usage']
+
+    def close(self) -> None:
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
+
+class ForkServerPool:
+    """Idle fork-servers kept for reuse, one server serves one testcase at a time."""
+
+    def __init__(self,max_idle:int) -> None:
+        self.idle = queue.LifoQueue()
+        self.max_idle = max_idle
+
+    @contextmanager
+    def server(self):
+        try:
+            server = self.idle.get_nowait()
+        except queue.Empty:
+            server = ForkServer()
+        try:
+            yield server
+        except BaseException:
+            server.close()
+            raise
+        if self.idle.qsize() < self.max_idle:
+            self.idle.put(server)
+        else:
+            server.close()
+
+forkserver_pool = ForkServerPool(max_idle=os.cpu_count() or 1)
+
+if __name__ == "__main__":
+    serve()
@@ -1,4 +1,11 @@
-import subprocess
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from .cache import compile_cache
+from .forkserver import forkserver_pool
+from .container import MEMORY_LIMIT,OUTPUT_LIMIT
 
 """
 Usecases:
@@ -18,29 +25,40 @@ class RuntimeResult:
     RUNTIME_STATUS = [
         'OK',
         'ERROR',
-        'TIMEOUT'
+        'TIMEOUT',
+        'SKIPPED'
     ]
 
-    def __init__(self,input:str,output:str,runtime_status:RUNTIME_STATUS) -> None:
+    def __init__(self,input:str,output:str,runtime_status:RUNTIME_STATUS,wall_time:float=None,cpu_time:float=None,memory:int=None) -> None:
         self.input = input
         self.output = output
         self.runtime_status = runtime_status
+        # Resource usage of the run, None when the program never ran
+        self.wall_time = wall_time # (Second)
+        self.cpu_time = cpu_time # (Second) user + sys
+        self.memory = memory # (KB) max RSS
 
     def __iter__(self):
         yield 'input',self.input
         yield 'output',self.output
         yield 'runtime_status',self.runtime_status
+        yield 'wall_time',self.wall_time
+        yield 'cpu_time',self.cpu_time
+        yield 'memory',self.memory
 
     def __str__(self) -> str:
         return str(dict(self))
 
 class GradingResult:
-    def __init__(self,input:str,output:str,runtime_status:RuntimeResult.RUNTIME_STATUS,expected_output:str,is_passed:bool) -> None:
+    def __init__(self,input:str,output:str,runtime_status:RuntimeResult.RUNTIME_STATUS,expected_output:str,is_passed:bool,wall_time:float=None,cpu_time:float=None,memory:int=None) -> None:
         self.input = input
         self.output = output
         self.runtime_status = runtime_status
         self.expected_output = expected_output
         self.is_passed = is_passed
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.memory = memory
 
     def __iter__(self):
         yield 'input',self.input
@@ -48,6 +66,9 @@ class GradingResult:
         yield 'runtime_status',self.runtime_status
         yield 'expected_output',self.expected_output
         yield 'is_passed',self.is_passed
+        yield 'wall_time',self.wall_time
+        yield 'cpu_time',self.cpu_time
+        yield 'memory',self.memory
 
     def __str__(self) -> str:
         return str(dict(self))
@@ -70,35 +91,95 @@ class GradingResultList:
         self.has_timeout = len([res for res in gradingResult if res.runtime_status == "TIMEOUT"]) > 0
         self.runnable = not (self.has_error or self.has_timeout)
         self.is_passed = len([res for res in gradingResult if res.is_passed]) == len(gradingResult)
+        # Totals over the testcases that ran
+        self.wall_time = sum([res.wall_time for res in gradingResult if res.wall_time is not None])
+        self.cpu_time = sum([res.cpu_time for res in gradingResult if res.cpu_time is not None])
+        self.memory = max([res.memory for res in gradingResult if res.memory is not None],default=None)
 
     def getResult(self) -> list[dict]:
         return [dict(i) for i in self.data]
         
 
 class ProgramGrader:
-    def __init__(self,code:str,testcases:list[str],section:int,timeout:float) -> None:
+    def __init__(self,code:str,testcases:list[str],timeout:float,concurrency:int=1,memory_limit:int=MEMORY_LIMIT,output_limit:int=OUTPUT_LIMIT) -> None:
         self.code = code
         self.testcases = testcases
-        self.section = section
         self.timeout = timeout
-
-    def import_testcases(self) -> None:
-        for i in range(len(self.testcases)):
-            with open(f'./api/sandbox/section{self.section}/testcases/{i}.txt','w') as f:
-                f.write(self.testcases[i])
+        # Maximum number of testcases of this program running at the same time
+        self.concurrency = max(1,int(concurrency))
+        # (Byte) address space of the program and how much of its output is kept
+        self.memory_limit = int(memory_limit)
+        self.output_limit = int(output_limit)
+        self.workspace = None
 
     def import_source_code(self) -> None:
         pass
 
     def setup(self) -> None:
-        self.import_testcases()
+        # Every grading gets its own directory, testcases are piped to stdin from memory
+        self.workspace = tempfile.mkdtemp(prefix='grader-')
         self.import_source_code()
+
+    def cleanup(self) -> None:
+        if self.workspace:
+            shutil.rmtree(self.workspace,ignore_errors=True)
+            self.workspace = None
         
     def compile(self) -> None:
         pass
 
-    def runtime(self) -> list[RuntimeResult]:
+    def runner_command(self) -> list[str]:
         pass
+
+    def run_testcase(self,index:int) -> RuntimeResult:
+        # Launched by a fork-server so the rusage is not inflated by this process
+        with forkserver_pool.server() as server:
+            runtime_status,output,usage = server.spawn(
+                self.runner_command(),self.testcases[index],float(self.timeout),
+                self.workspace,self.memory_limit,self.output_limit)
+        return self.runtime_result(index,runtime_status,output,usage)
+
+    def runtime_result(self,index:int,runtime_status:str,output:bytes,usage:dict) -> RuntimeResult:
+        if output is not None:
+            output = output.decode(errors='replace')
+        return RuntimeResult(self.testcases[index],output,runtime_status,**(usage or {}))
+
+    def runtime(self,on_result=None,should_stop=None) -> list[RuntimeResult]:
+        """
+        Run every testcase, up to self.concurrency of them at once. Results and
+        on_result(index,result) calls always come back in testcase order.
+        should_stop(index) is asked after each on_result call, once it returns True
+        every later testcase is SKIPPED without being executed.
+        """
+        stopped = threading.Event()
+
+        def run(index:int) -> RuntimeResult:
+            if stopped.is_set():
+                return RuntimeResult(self.testcases[index],None,"SKIPPED")
+            return self.run_testcase(index)
+
+        workers = min(self.concurrency,len(self.testcases))
+        if workers <= 1:
+            runs = map(run,range(len(self.testcases)))
+            return self.collect_runtime(runs,stopped,on_result,should_stop)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            runs = executor.map(run,range(len(self.testcases)))
+            return self.collect_runtime(runs,stopped,on_result,should_stop)
+
+    def collect_runtime(self,runs,stopped:threading.Event,on_result=None,should_stop=None) -> list[RuntimeResult]:
+        result = []
+        for i,runtime_result in enumerate(runs):
+            if stopped.is_set():
+                # Testcases already running when the stop was decided are discarded
+                # too, so the outcome does not depend on the concurrency
+                runtime_result = RuntimeResult(self.testcases[i],None,"SKIPPED")
+            result.append(runtime_result)
+            if on_result:
+                on_result(i,runtime_result)
+            if should_stop and not stopped.is_set() and should_stop(i):
+                stopped.set()
+        return result
         
     def generate_output(self) -> RuntimeResultList:
         try:
@@ -107,121 +188,105 @@ class ProgramGrader:
             return RuntimeResultList(self.runtime())
         except Exception as e:
             return RuntimeResultList([RuntimeResult(testcase,None,"ERROR") for testcase in self.testcases])
+        finally:
+            self.cleanup()
+
+    def grade(self,runtime_result:RuntimeResult,expected_output:str) -> GradingResult:
+        is_passed = False
+        output = None
+
+        if runtime_result.runtime_status == "OK":
+            
+            output = runtime_result.output
+            if forgiveableFormat(runtime_result.output) == forgiveableFormat(expected_output):
+                is_passed = True
+            else:
+                runtime_result.runtime_status = "FAILED"
+        
+        return GradingResult(
+             runtime_result.input,
+             output,
+             runtime_result.runtime_status,
+             expected_output,
+             is_passed,
+             runtime_result.wall_time,
+             runtime_result.cpu_time,
+             runtime_result.memory
+        )
+
+    def grading(self,expected_output:list[str],on_result=None,fail_fast:bool=False,max_consecutive_timeouts:int=0) -> GradingResultList:
+        """
+        Grade the code against expected_output. If on_result is given, it is
+        called with (index,GradingResult) as soon as each testcase is graded.
+        With fail_fast the testcases after the first failed one are SKIPPED, with
+        max_consecutive_timeouts > 0 the ones after that many TIMEOUTs in a row.
+        """
+        if len(self.testcases) != len(expected_output):
+            raise Exception("Length of expected output and runtime result is not equal")
+
+        grading_result = [None for i in self.testcases]
+
+        def collect(index:int,runtime_result:RuntimeResult) -> None:
+            grading_result[index] = self.grade(runtime_result,expected_output[index])
+            if on_result:
+                on_result(index,grading_result[index])
+
+        def should_stop(index:int) -> bool:
+            if fail_fast and not grading_result[index].is_passed:
+                return True
+            if max_consecutive_timeouts > 0 and index+1 >= max_consecutive_timeouts:
+                recent = grading_result[index+1-max_consecutive_timeouts:index+1]
+                return all([res.runtime_status == "TIMEOUT" for res in recent])
+            return False
 
-    def grading(self,expected_output:list[str]) -> GradingResultList:
         try:
             self.setup()
             self.compile()
-            runtime_result = self.runtime()
+            self.runtime(collect,should_stop)
         except:
-            runtime_result = [RuntimeResult(testcase,None,"ERROR") for testcase in self.testcases]
-
-        if len(runtime_result) != len(expected_output):
-            raise Exception("Length of expected output and runtime result is not equal")
-        
-        grading_result = []
-        for i in range(len(runtime_result)):
-
-            is_passed = False
-            output = None
-
-            if runtime_result[i].runtime_status == "OK":
-                
-                output = runtime_result[i].output
-                if forgiveableFormat(runtime_result[i].output) == forgiveableFormat(expected_output[i]):
-                    is_passed = True
-                else:
-                    runtime_result[i].runtime_status = "FAILED"
-            
-            grading_result.append(GradingResult(
-                 runtime_result[i].input,
-                 output,
-                 runtime_result[i].runtime_status,
-                 expected_output[i],
-                 is_passed
-            ))
+            for i in range(len(self.testcases)):
+                if grading_result[i] is None:
+                    collect(i,RuntimeResult(self.testcases[i],None,"ERROR"))
+        finally:
+            self.cleanup()
 
         return GradingResultList(grading_result)
 
 class PythonGrader(ProgramGrader):
 
     def import_source_code(self) -> None:
-        with open(f'./api/sandbox/section{self.section}/runner.py','w') as f:
+        with open(f'{self.workspace}/runner.py','w') as f:
             f.write(self.code)
 
-    def runtime(self) -> list[RuntimeResult]:
-        
-        result = []
-        
-        for i in range(len(self.testcases)):
-            try:
-                runner = subprocess.check_output([
-                    'python',f'./api/sandbox/section{self.section}/runner.py'],
-                    stdin=open(f'./api/sandbox/section{self.section}/testcases/{i}.txt',
-                    'r'
-                ),stderr=subprocess.DEVNULL,timeout=float(self.timeout))
-                result.append(RuntimeResult(self.testcases[i],runner.decode(),"OK"))
-            except subprocess.CalledProcessError:
-                result.append(RuntimeResult(self.testcases[i],None,"ERROR"))
-            except subprocess.TimeoutExpired:
-                result.append(RuntimeResult(self.testcases[i],None,"TIMEOUT"))
+    def runner_command(self) -> list[str]:
+        return ['python',f'{self.workspace}/runner.py']
 
-        return result
+    def run_testcase(self,index:int) -> RuntimeResult:
+        if not settings.GRADER_PYTHON_FORKSERVER:
+            return super().run_testcase(index)
 
-class CGrader(ProgramGrader):
+        with forkserver_pool.server() as server:
+            runtime_status,output,usage = server.run(self.code,self.testcases[index],float(self.timeout),self.workspace,self.memory_limit,self.output_limit)
+        return self.runtime_result(index,runtime_status,output,usage)
 
-    def import_source_code(self) -> None:
-        with open(f'./api/sandbox/section{self.section}/runner.c','w') as f:
-            f.write(self.code)
+class CGrader(ProgramGrader):
+    COMPILER = ['gcc']
 
     def compile(self) -> None:
-        subprocess.check_output(['gcc',f'./api/sandbox/section{self.section}/runner.c','-o',f'./api/sandbox/section{self.section}/runner.exe'],stderr=subprocess.DEVNULL)
+        # Identical sources (resubmissions, re-running a problem's solution) reuse the cached binary
+        self.executable = compile_cache.get_or_compile('c',self.COMPILER,'c',self.code)
 
-    def runtime(self) -> list[RuntimeResult]:
-            
-            result = []
-            
-            for i in range(len(self.testcases)):
-                try:
-                    runner = subprocess.check_output([
-                        f'./api/sandbox/section{self.section}/runner.exe'],
-                        stdin=open(f'./api/sandbox/section{self.section}/testcases/{i}.txt',
-                        'r'
-                    ),stderr=subprocess.DEVNULL,timeout=float(self.timeout))
-                    result.append(RuntimeResult(self.testcases[i],runner.decode(),"OK"))
-                except subprocess.CalledProcessError:
-                    result.append(RuntimeResult(self.testcases[i],None,"ERROR"))
-                except subprocess.TimeoutExpired:
-                    result.append(RuntimeResult(self.testcases[i],None,"TIMEOUT"))
-    
-            return result
+    def runner_command(self) -> list[str]:
+        return [self.executable]
 
 class CppGrader(ProgramGrader):
-    def import_source_code(self) -> None:
-        with open(f'./api/sandbox/section{self.section}/runner.cpp','w') as f:
-            f.write(self.code)
+    COMPILER = ['g++']
 
     def compile(self) -> None:
-        subprocess.check_output(['g++',f'./api/sandbox/section{self.section}/runner.cpp','-o',f'./api/sandbox/section{self.section}/runner.exe'],stderr=subprocess.DEVNULL)
+        self.executable = compile_cache.get_or_compile('cpp',self.COMPILER,'cpp',self.code)
 
-    def runtime(self) -> list[RuntimeResult]:
-            
-            result = []
-            
-            for i in range(len(self.testcases)):
-                try:
-                    runner = subprocess.check_output([
-                        f'./api/sandbox/section{self.section}/runner.exe'],
-                        stdin=open(f'./api/sandbox/section{self.section}/testcases/{i}.txt',
-                        'r'
-                    ),stderr=subprocess.DEVNULL,timeout=float(self.timeout))
-                    result.append(RuntimeResult(self.testcases[i],runner.decode(),"OK"))
-                except subprocess.CalledProcessError:
-                    result.append(RuntimeResult(self.testcases[i],None,"ERROR"))
-                except subprocess.TimeoutExpired:
-                    result.append(RuntimeResult(self.testcases[i],None,"TIMEOUT"))
-    
-            return result
+    def runner_command(self) -> list[str]:
+        return [self.executable]
 
 
 Grader:list[ProgramGrader] = {
@@ -277,5 +342,5 @@ Grader:list[ProgramGrader] = {
 # cresult = ["-1\r\n","34\r\n","14\r\n"]
 
 # grader = Grader['python']
-# result = grader(adder,test,1,1.5).grading(pyresult)
+# result = grader(adder,test,1.5).grading(pyresult)
 # print(result.getResult())
\ No newline at end of file
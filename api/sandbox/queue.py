@@ -1,16 +1,157 @@
+import os
+import fcntl
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+from django.conf import settings
+
 class Queue():
-    def __init__(self,SIZE) -> None:
-        self.memory = [0 for i in range(SIZE)]
+    """
+    Hands out grading sections, bounding how many programs are graded at once.
+
+    A section is reserved under a condition variable inside the process and
+    under an exclusive flock on <path>/sectionN.lock across processes, so the
+    bound holds for all gunicorn workers of the node. Callers block until a
+    section is free instead of sleeping in a loop.
+
+    Each process also keeps its number of waiting callers in
+    <path>/waiting-<pid>, so metrics() can report busy sections and waiters
+    for the whole node.
+    """
+
+    def __init__(self,SIZE:int,path:str,poll_interval:float=0.1) -> None:
         self.size = SIZE
-    
+        # Directory of the lock files, shared by every process of the node
+        self.path = path
+        self.memory = [0 for i in range(SIZE)]
+        self.lock_files = [None for i in range(SIZE)]
+        self.condition = threading.Condition()
+        # Another process can only free a section by releasing its flock, which
+        # does not wake this condition, so waiters re-check on this interval.
+        self.poll_interval = poll_interval
+
+        self.waiting = 0
+        self.total_reserved = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def _lock_section(self,index:int):
+        os.makedirs(self.path,exist_ok=True)
+        lock_file = open(f'{self.path}/section{index+1}.lock','w')
+        try:
+            fcntl.flock(lock_file,fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    def _waiting_path(self,pid:int) -> str:
+        return f'{self.path}/waiting-{pid}'
+
+    def _set_waiting(self,waiting:int) -> None:
+        # Called with self.condition held
+        self.waiting = waiting
+        os.makedirs(self.path,exist_ok=True)
+        with open(self._waiting_path(os.getpid()),'w') as f:
+            f.write(str(waiting))
+
+    def _node_waiting(self) -> int:
+        waiting = 0
+        for name in os.listdir(self.path) if os.path.isdir(self.path) else []:
+            if not name.startswith('waiting-'):
+                continue
+            path = f'{self.path}/{name}'
+            try:
+                os.kill(int(name[len('waiting-'):]),0)
+                with open(path) as f:
+                    waiting += int(f.read() or 0)
+            except ProcessLookupError:
+                # Left behind by a process that has exited
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            except (PermissionError,FileNotFoundError,ValueError):
+                pass
+        return waiting
+
+    def _section_busy(self,index:int) -> bool:
+        # Called with self.condition held. A section is busy while any process
+        # holds its flock, probing takes the lock for an instant only.
+        if self.memory[index]:
+            return True
+        lock_file = self._lock_section(index)
+        if lock_file is None:
+            return True
+        fcntl.flock(lock_file,fcntl.LOCK_UN)
+        lock_file.close()
+        return False
+
     def isAvaliable(self) -> int:
         for i in range(self.size):
             if self.memory[i] == 0:
-                return i
+                lock_file = self._lock_section(i)
+                if lock_file is not None:
+                    self.memory[i] = 1
+                    self.lock_files[i] = lock_file
+                    return i
         return -1
-    
-    def reserve(self,index:int) -> None:
-        self.memory[index] = 1
-    
-    def free(self,index:int) -> None:
-        self.memory[index] = 0
\ No newline at end of file
+
+    def reserve(self,timeout:float=None) -> int:
+        """Block until a section is free and return its number (1-based)."""
+        start = monotonic()
+        with self.condition:
+            self._set_waiting(self.waiting+1)
+            try:
+                index = self.isAvaliable()
+                while index == -1:
+                    if timeout is not None and monotonic()-start >= timeout:
+                        raise TimeoutError("No grading section became available")
+                    self.condition.wait(self.poll_interval)
+                    index = self.isAvaliable()
+            finally:
+                self._set_waiting(self.waiting-1)
+
+            wait_time = monotonic()-start
+            self.total_reserved += 1
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time,wait_time)
+        return index+1
+
+    def free(self,section:int) -> None:
+        index = section-1
+        with self.condition:
+            lock_file = self.lock_files[index]
+            self.lock_files[index] = None
+            self.memory[index] = 0
+            if lock_file is not None:
+                fcntl.flock(lock_file,fcntl.LOCK_UN)
+                lock_file.close()
+            self.condition.notify()
+
+    @contextmanager
+    def section(self,timeout:float=None):
+        section = self.reserve(timeout)
+        try:
+            yield section
+        finally:
+            self.free(section)
+
+    def metrics(self) -> dict:
+        """busy and waiting cover every process of the node, the wait statistics this process only"""
+        with self.condition:
+            return {
+                'size': self.size,
+                'busy': len([i for i in range(self.size) if self._section_busy(i)]),
+                'waiting': self._node_waiting(),
+                'total_reserved': self.total_reserved,
+                'average_wait_time': self.total_wait_time/self.total_reserved if self.total_reserved else 0.0,
+                'max_wait_time': self.max_wait_time,
+            }
+
+grading_queue = Queue(settings.GRADER_SECTIONS,settings.GRADER_LOCK_DIR)
+
+# Background gradings (asynchronous submissions). Each job still reserves a
+# section from grading_queue, so this only bounds the number of idle waiters.
+grading_executor = ThreadPoolExecutor(max_workers=settings.GRADER_SECTIONS,thread_name_prefix='grader')
@@ -166,14 +166,14 @@ class SubmissionPoplulateProblemSecureSerializer(serializers.ModelSerializer):
 class SubmissionTestcaseSecureSerializer(serializers.ModelSerializer):
     class Meta:
         model = SubmissionTestcase
-        fields = ['is_passed','runtime_status']
+        fields = ['is_passed','runtime_status','wall_time','cpu_time','memory']
 
 class SubmissionPopulateSubmissionTestcaseSecureSerializer(serializers.ModelSerializer):
     # Add testcases field
     runtime_output = SubmissionTestcaseSecureSerializer(many=True)
     class Meta:
         model = Submission
-        fields = ['submission_id','account','problem','topic','language','submission_code','is_passed','date','score','max_score','passed_ratio','runtime_output']
+        fields = ['submission_id','account','problem','topic','language','submission_code','is_passed','date','score','max_score','passed_ratio','status','wall_time','cpu_time','memory','runtime_output']
 
 class SubmissionPopulateSubmissionTestcaseAndProblemSecureSerializer(serializers.ModelSerializer):
     # Add testcases field
@@ -182,7 +182,15 @@ class SubmissionPopulateSubmissionTestcaseAndProblemSecureSerializer(serializers
     topic = TopicSecureSerializer()
     class Meta:
         model = Submission
-        fields = ['submission_id','account','problem','topic','language','submission_code','is_passed','date','score','max_score','passed_ratio','runtime_output']
+        fields = ['submission_id','account','problem','topic','language','submission_code','is_passed','date','score','max_score','passed_ratio','status','wall_time','cpu_time','memory','runtime_output']
+
+class SubmissionPopulateSubmissionTestcaseAndProblemWithoutCodeSecureSerializer(serializers.ModelSerializer):
+    runtime_output = SubmissionTestcaseSecureSerializer(many=True)
+    problem = ProblemSecureSerializer()
+    topic = TopicSecureSerializer()
+    class Meta:
+        model = Submission
+        fields = ['submission_id','account','problem','topic','language','is_passed','date','score','max_score','passed_ratio','status','wall_time','cpu_time','memory','runtime_output']
 
 class ProblemPopulateAccountAndSubmissionPopulateSubmissionTestcasesSecureSerializer(serializers.ModelSerializer):
     # Add testcases field
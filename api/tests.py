@@ -1,3 +1,625 @@
-from django.test import TestCase
+import io
+import os
+import sys
+import json
+import random
+import tempfile
+import threading
+import subprocess
+from datetime import timedelta
+from django.db import connection
+from django.db.models import Sum,Avg
+from django.core.management import call_command
+from django.test import TestCase,TransactionTestCase,override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient,APIRequestFactory
+from rest_framework.exceptions import AuthenticationFailed
+from .models import *
+from .utility import passwordEncryption
+from .authentication import AccountTokenAuthentication
+from .caches.backends import AtomicFileBasedCache
+from .caches.testcases import get_problem_testcases
+from .sandbox.cache import CompileCache
+from .sandbox.grader import PythonGrader
+from .sandbox.queue import Queue
+from .controllers.account.update_daily_submission_count import record_daily_submission
+from .controllers.topic.update_topic_progress import record_topic_progress
+from .difficulty_predictor.preprocess import import_pandas,modelgrader_features,PREPROCESSOR_COLUMNS
+from .controllers.submission.submit_problem import update_best_submission,fail_stale_submissions
+from .controllers.problem.update_problem_difficulty import record_first_passed_statistic
+from .controllers.submission.stream_submission import submission_events
 
 # Create your tests here.
+
+class ProblemWithBestSubmissionTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.account = Account.objects.create(username="student",password="password",email="student@example.com")
+        self.creator = Account.objects.create(username="teacher",password="password",email="teacher@example.com")
+
+    def create_problem(self,passed_ratios:list[float]) -> Problem:
+        problem = Problem.objects.create(creator=self.creator,language="python",title="Problem",description="",solution="print(1)")
+        testcase = Testcase.objects.create(problem=problem,input="",output="1\n",runtime_status="OK")
+        for passed_ratio in passed_ratios:
+            submission = Submission.objects.create(problem=problem,account=self.account,language="python",submission_code="print(1)",is_passed=passed_ratio == 1,passed_ratio=passed_ratio)
+            SubmissionTestcase.objects.create(submission=submission,testcase=testcase,output="1\n",is_passed=passed_ratio == 1,runtime_status="OK")
+            topic = Topic.objects.create(creator=self.creator,name="Topic",description="")
+            BestSubmission.objects.create(problem=problem,account=self.account,topic=topic,submission=submission)
+        return problem
+
+    def get_problems(self,query:str=""):
+        return self.client.get(f"/api/problems?account_id={self.account.account_id}{query}")
+
+    def test_query_count_does_not_grow_with_problems(self):
+        for i in range(3):
+            self.create_problem([0.5,1])
+        # account, count, problems, best submissions, submission testcases
+        with self.assertNumQueries(5):
+            response = self.get_problems()
+        self.assertEqual(len(response.data['problems']),3)
+
+        for i in range(5):
+            self.create_problem([0,0.5])
+        self.create_problem([])
+        with self.assertNumQueries(5):
+            response = self.get_problems()
+        self.assertEqual(len(response.data['problems']),9)
+
+    def test_best_submission_over_topics(self):
+        self.create_problem([0.5,1,0])
+        response = self.get_problems()
+        best_submission = response.data['problems'][0]['best_submission']
+        self.assertEqual(best_submission['passed_ratio'],1)
+        self.assertEqual(len(best_submission['runtime_output']),1)
+
+        # Newest problem comes first and has no submission
+        self.create_problem([])
+        response = self.get_problems()
+        self.assertIsNone(response.data['problems'][0]['best_submission'])
+
+    def test_pagination(self):
+        for i in range(4):
+            self.create_problem([1])
+        response = self.get_problems("&start=1&end=3")
+        self.assertEqual(response.data['total_problems'],4)
+        self.assertEqual(len(response.data['problems']),2)
+
+class TopicPublicTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.account = Account.objects.create(username="student",password="password",email="student@example.com")
+        self.creator = Account.objects.create(username="teacher",password="password",email="teacher@example.com")
+        self.group = Group.objects.create(creator=self.creator,name="Students")
+        GroupMember.objects.create(group=self.group,account=self.account)
+        self.topic = Topic.objects.create(creator=self.creator,name="Topic",description="")
+
+    def create_collection(self,problems:int,hidden:int=0) -> Collection:
+        collection = Collection.objects.create(creator=self.creator,name="Collection")
+        CollectionGroupPermission.objects.create(collection=collection,group=self.group,permission_view_collections=True)
+        TopicCollection.objects.create(topic=self.topic,collection=collection)
+        for i in range(problems+hidden):
+            problem = Problem.objects.create(creator=self.creator,language="python",title="Problem",description="",solution="print(1)")
+            CollectionProblem.objects.create(collection=collection,problem=problem)
+            if i < problems:
+                ProblemGroupPermission.objects.create(problem=problem,group=self.group,permission_view_problems=True)
+            testcase = Testcase.objects.create(problem=problem,input="",output="1\n",runtime_status="OK")
+            submission = Submission.objects.create(problem=problem,account=self.account,topic=self.topic,language="python",submission_code="print(1)",is_passed=True,passed_ratio=1)
+            SubmissionTestcase.objects.create(submission=submission,testcase=testcase,output="1\n",is_passed=True,runtime_status="OK")
+            BestSubmission.objects.create(problem=problem,account=self.account,topic=self.topic,submission=submission)
+        return collection
+
+    def get_topic(self):
+        return self.client.get(f"/api/topics/{self.topic.topic_id}?account_id={self.account.account_id}")
+
+    def test_query_count_does_not_grow_with_collections(self):
+        self.create_collection(2)
+        # topic, account, 3 effective permissions, collections, problems, best submissions, submission testcases
+        with self.assertNumQueries(9):
+            self.get_topic()
+        # Effective permissions are cached now
+        with self.assertNumQueries(6):
+            self.get_topic()
+
+        for i in range(3):
+            self.create_collection(4,hidden=1)
+        self.get_topic()
+        with self.assertNumQueries(6):
+            response = self.get_topic()
+
+        collections = response.data['collections']
+        self.assertEqual(len(collections),4)
+        self.assertEqual(sum([len(tc['collection']['problems']) for tc in collections]),14)
+        for tc in collections:
+            for cp in tc['collection']['problems']:
+                self.assertEqual(len(cp['problem']['best_submission']['runtime_output']),1)
+
+    def test_hidden_collection(self):
+        collection = self.create_collection(1)
+        CollectionGroupPermission.objects.filter(collection=collection).update(permission_view_collections=False)
+        self.assertEqual(len(self.get_topic().data['collections']),0)
+
+    def test_permission_change_invalidates_cache(self):
+        collection = self.create_collection(1)
+        self.assertEqual(len(self.get_topic().data['collections']),1)
+
+        CollectionGroupPermission.objects.filter(collection=collection).delete()
+        self.assertEqual(len(self.get_topic().data['collections']),0)
+
+        CollectionGroupPermission.objects.create(collection=collection,group=self.group,permission_manage_collections=True)
+        self.assertEqual(len(self.get_topic().data['collections']),1)
+
+        GroupMember.objects.filter(account=self.account).delete()
+        self.assertEqual(len(self.get_topic().data['collections']),0)
+
+    def test_manageable_problems(self):
+        problem = Problem.objects.create(creator=self.creator,language="python",title="Problem",description="",solution="print(1)")
+        Problem.objects.create(creator=self.creator,language="python",title="Problem",description="",solution="print(1)")
+        # Granted by two groups, listed once
+        other = Group.objects.create(creator=self.creator,name="Assistants")
+        GroupMember.objects.create(group=other,account=self.account)
+        for group in [self.group,other]:
+            ProblemGroupPermission.objects.create(problem=problem,group=group,permission_manage_problems=True)
+        response = self.client.get(f"/api/accounts/{self.account.account_id}/problems")
+        self.assertEqual([p['problem_id'] for p in response.data['manageable_problems']],[str(problem.problem_id)])
+
+class AuthorizationTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.account = Account.objects.create(username="student",password=passwordEncryption("password"),email="student@example.com")
+
+    def login(self,password:str="password"):
+        return self.client.post("/api/login",{"username":"student","password":password},format="json")
+
+    def authorize(self,token:str):
+        return self.client.put("/api/token",{"account_id":str(self.account.account_id),"token":token},format="json").data['result']
+
+    def test_cached_token(self):
+        token = self.login().data['token']
+        self.assertTrue(self.authorize(token))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.authorize(token))
+            self.assertFalse(self.authorize("wrong"))
+            self.assertFalse(self.authorize("é"))
+
+    def test_logout_and_login_replace_cached_token(self):
+        token = self.login().data['token']
+        self.assertTrue(self.authorize(token))
+        new_token = self.login().data['token']
+        self.assertFalse(self.authorize(token))
+        self.assertTrue(self.authorize(new_token))
+
+        self.client.post("/api/logout",{"account_id":str(self.account.account_id),"token":new_token},format="json")
+        self.assertFalse(self.authorize(new_token))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_per_process_cache_is_not_used(self):
+        token = self.login().data['token']
+        self.assertTrue(self.authorize(token))
+        # Another worker logs the account out, this one must see it at once
+        Account.objects.filter(account_id=self.account.account_id).update(token="revoked")
+        with self.assertNumQueries(1):
+            self.assertFalse(self.authorize(token))
+
+    def test_authentication_class(self):
+        token = self.login().data['token']
+        request = APIRequestFactory().get("/",HTTP_AUTHORIZATION=f"Token {self.account.account_id}:{token}")
+        user,auth = AccountTokenAuthentication().authenticate(request)
+        self.assertEqual(user.account_id,str(self.account.account_id))
+
+        request = APIRequestFactory().get("/",HTTP_AUTHORIZATION=f"Token {self.account.account_id}:wrong")
+        with self.assertRaises(AuthenticationFailed):
+            AccountTokenAuthentication().authenticate(request)
+
+        request = APIRequestFactory().get("/",HTTP_AUTHORIZATION=f"Token {self.account.account_id}:é")
+        with self.assertRaises(AuthenticationFailed):
+            AccountTokenAuthentication().authenticate(request)
+
+class AtomicFileBasedCacheTest(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = AtomicFileBasedCache(directory.name,{})
+
+    def test_add_never_overwrites(self):
+        self.assertTrue(self.cache.add('token','old'))
+        # A logout wrote the entry after the reader loaded its row
+        self.cache.set('token',None)
+        self.assertFalse(self.cache.add('token','old'))
+        self.assertIsNone(self.cache.get('token','missing'))
+
+    def test_add_after_expiry(self):
+        self.cache.set('token','old',-1)
+        self.assertEqual(self.cache.get('token','missing'),'missing')
+        self.assertTrue(self.cache.add('token','new'))
+        self.assertEqual(self.cache.get('token'),'new')
+
+class ProblemTestcasesCacheTest(TestCase):
+
+    def test_update_problem_invalidates_testcases(self):
+        creator = Account.objects.create(username="teacher",password="password",email="teacher@example.com")
+        problem = Problem.objects.create(creator=creator,language="python",title="Problem",description="",solution="print(int(input())*2)")
+        Testcase.objects.create(problem=problem,input="1",output="2\n",runtime_status="OK")
+        self.assertEqual(get_problem_testcases(problem.problem_id)[1:],(["1"],["2\n"]))
+        with self.assertNumQueries(0):
+            get_problem_testcases(problem.problem_id)
+
+        response = APIClient().put(f"/api/accounts/{creator.account_id}/problems/{problem.problem_id}",{"language":"python","testcases":["3","4"]},format="json")
+        self.assertEqual(response.status_code,201)
+        testcase_ids,inputs,outputs = get_problem_testcases(problem.problem_id)
+        self.assertEqual((inputs,outputs),(["3","4"],["6\n","8\n"]))
+        self.assertEqual(set(testcase_ids),set(Testcase.objects.filter(problem=problem,deprecated=False).values_list('testcase_id',flat=True)))
+
+class SubmissionLogTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.account = Account.objects.create(username="student",password="password",email="student@example.com")
+        self.problem = Problem.objects.create(creator=self.account,language="python",title="Problem",description="",solution="print(1)")
+        testcase = Testcase.objects.create(problem=self.problem,input="",output="1\n",runtime_status="OK")
+        date = timezone.now()
+        # Half of the submissions share a date so the cursor relies on submission_id
+        for i in range(7):
+            submission = Submission.objects.create(problem=self.problem,account=self.account,language="python",submission_code="print(1)",is_passed=True,passed_ratio=i/7,date=date if i%2 else date-timedelta(minutes=i))
+            SubmissionTestcase.objects.create(submission=submission,testcase=testcase,output="1\n",is_passed=True,runtime_status="OK")
+
+    def get_all_pages(self,query:str) -> list[dict]:
+        submissions = []
+        cursor = ""
+        while True:
+            # submissions, problem/topic joined, submission testcases
+            with self.assertNumQueries(2):
+                response = self.client.get(f"/api/submissions?limit=3{query}&cursor={cursor}")
+            submissions += response.data['submissions']
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                return submissions
+
+    def test_keyset_pagination(self):
+        submissions = self.get_all_pages("")
+        self.assertEqual(len(submissions),7)
+        self.assertEqual(len(set([s['submission_id'] for s in submissions])),7)
+        self.assertEqual([(s['date'],s['submission_id']) for s in submissions],sorted([(s['date'],s['submission_id']) for s in submissions],reverse=True))
+        self.assertEqual(len(submissions[0]['runtime_output']),1)
+
+        submissions = self.get_all_pages("&sort_score=1")
+        self.assertEqual([s['passed_ratio'] for s in submissions],sorted([s['passed_ratio'] for s in submissions],reverse=True))
+
+    def test_default_page_size_and_code_omission(self):
+        response = self.client.get("/api/submissions?code=0")
+        self.assertEqual(len(response.data['submissions']),7)
+        self.assertIsNone(response.data['next_cursor'])
+        self.assertNotIn('submission_code',response.data['submissions'][0])
+        self.assertEqual(self.client.get("/api/submissions?cursor=invalid").status_code,400)
+
+    def test_stream(self):
+        response = self.client.get("/api/submissions?stream=1&limit=2&sort_date=-1")
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(data['submissions']),7)
+        self.assertEqual([s['date'] for s in data['submissions']],sorted([s['date'] for s in data['submissions']]))
+
+class SubmissionStreamTest(TestCase):
+
+    def setUp(self):
+        account = Account.objects.create(username="student",password="password",email="student@example.com")
+        problem = Problem.objects.create(creator=account,language="python",title="Problem",description="",solution="print(1)")
+        self.submission = Submission.objects.create(problem=problem,account=account,language="python",submission_code="print(1)",is_passed=True,status="DONE")
+        # Saved out of order, the stream must still follow the testcase positions
+        for position in [2,0,3,1]:
+            testcase = Testcase.objects.create(problem=problem,input="",output=f"{position}\n",runtime_status="OK")
+            SubmissionTestcase.objects.create(submission=self.submission,testcase=testcase,output=f"{position}\n",runtime_status="OK",wall_time=position,position=position)
+
+    def test_testcases_in_position_order(self):
+        events = list(submission_events(self.submission.submission_id))
+        testcases = [json.loads(event.split("data: ",1)[1]) for event in events if event.startswith("event: testcase")]
+        self.assertEqual([t['index'] for t in testcases],[0,1,2,3])
+        self.assertEqual([t['wall_time'] for t in testcases],[0,1,2,3])
+        self.assertTrue(events[-1].startswith("event: done"))
+        done = json.loads(events[-1].split("data: ",1)[1])
+        self.assertEqual([t['wall_time'] for t in done['runtime_output']],[0,1,2,3])
+
+    @override_settings(GRADER_STREAM_TIMEOUT=0)
+    def test_timeout_of_lost_grading(self):
+        Submission.objects.filter(submission_id=self.submission.submission_id).update(status="GRADING")
+        events = list(submission_events(self.submission.submission_id))
+        self.assertEqual(len(events),5)
+        self.assertTrue(events[-1].startswith("event: timeout"))
+
+    def test_fail_stale_submissions(self):
+        Submission.objects.filter(submission_id=self.submission.submission_id).update(status="PENDING",date=timezone.now()-timedelta(hours=1))
+        fresh = Submission.objects.create(problem=self.submission.problem,account=self.submission.account,language="python",submission_code="print(1)",is_passed=False,status="GRADING")
+        self.assertEqual(fail_stale_submissions(1800),1)
+        self.assertEqual(Submission.objects.get(submission_id=self.submission.submission_id).status,"ERROR")
+        self.assertEqual(Submission.objects.get(submission_id=fresh.submission_id).status,"GRADING")
+
+        # Before the server starts every leftover grading is lost
+        call_command('fail_stale_submissions',stdout=io.StringIO())
+        self.assertEqual(Submission.objects.get(submission_id=fresh.submission_id).status,"ERROR")
+
+class DailySubmissionTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.account = Account.objects.create(username="student",password="password",email="student@example.com")
+        self.problem = Problem.objects.create(creator=self.account,language="python",title="Problem",description="",solution="print(1)")
+
+    def submit(self,date):
+        submission = Submission.objects.create(problem=self.problem,account=self.account,language="python",submission_code="print(1)",is_passed=True,date=date)
+        record_daily_submission(submission)
+
+    def get_daily(self,query:str=""):
+        return self.client.get(f"/api/accounts/{self.account.account_id}/daily-submissions?{query}")
+
+    def test_counts_match_submissions(self):
+        day = timezone.now().replace(hour=12)
+        for days,submissions in [(0,3),(1,1),(5,2)]:
+            for i in range(submissions):
+                self.submit(day-timedelta(days=days))
+
+        full = self.get_daily().data['submissions_by_date']
+        with self.assertNumQueries(1):
+            counts = self.get_daily("counts=1").data['submissions_by_date']
+        self.assertEqual({date:value['count'] for date,value in full.items()},{date:value['count'] for date,value in counts.items()})
+        self.assertEqual(sorted([value['count'] for value in counts.values()]),[1,2,3])
+        self.assertNotIn('submissions',list(counts.values())[0])
+
+        start = (day-timedelta(days=1)).date().isoformat()
+        self.assertEqual(len(self.get_daily(f"counts=1&start={start}").data['submissions_by_date']),2)
+        self.assertEqual(len(self.get_daily(f"start={start}&end={start}").data['submissions_by_date']),1)
+        self.assertEqual(self.get_daily("start=yesterday").status_code,400)
+
+class TopicScoreboardTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.creator = Account.objects.create(username="teacher",password="password",email="teacher@example.com")
+        self.topic = Topic.objects.create(creator=self.creator,name="Topic",description="")
+        collection = Collection.objects.create(creator=self.creator,name="Collection")
+        TopicCollection.objects.create(topic=self.topic,collection=collection)
+        self.problems = []
+        for i in range(3):
+            problem = Problem.objects.create(creator=self.creator,language="python",title=f"Problem {i}",description="",solution="print(1)")
+            CollectionProblem.objects.create(collection=collection,problem=problem,order=i)
+            self.problems.append(problem)
+
+    def submit(self,account:Account,problem:Problem,passed_ratio:float,topic:Topic=None):
+        submission = Submission.objects.create(problem=problem,account=account,topic=topic or self.topic,language="python",submission_code="print(1)",is_passed=passed_ratio == 1,passed_ratio=passed_ratio)
+        record_topic_progress(submission)
+
+    def get_scoreboard(self):
+        return self.client.get(f"/api/accounts/{self.creator.account_id}/topics/{self.topic.topic_id}/scoreboard")
+
+    def test_best_ratio_and_totals(self):
+        students = [Account.objects.create(username=f"student{i}",password="password",email=f"student{i}@example.com") for i in range(2)]
+        self.submit(students[0],self.problems[0],1)
+        self.submit(students[0],self.problems[0],0.5)
+        self.submit(students[0],self.problems[1],0.5)
+        self.submit(students[1],self.problems[2],0.25)
+        self.submit(students[1],self.problems[2],0.75)
+        self.submit(students[1],self.problems[1],1,Topic.objects.create(creator=self.creator,name="Other",description=""))
+
+        # topic, account, problems, progress with accounts
+        with self.assertNumQueries(4):
+            response = self.get_scoreboard()
+        self.assertEqual([p['title'] for p in response.data['problems']],["Problem 0","Problem 1","Problem 2"])
+        scoreboard = response.data['scoreboard']
+        self.assertEqual([row['account']['username'] for row in scoreboard],["student0","student1"])
+        self.assertEqual(scoreboard[0]['problems'],{self.problems[0].problem_id:1,self.problems[1].problem_id:0.5})
+        self.assertEqual((scoreboard[0]['total_score'],scoreboard[0]['passed_problems']),(1.5,1))
+        self.assertEqual((scoreboard[1]['total_score'],scoreboard[1]['passed_problems']),(0.75,0))
+
+class BestSubmissionConcurrencyTest(TransactionTestCase):
+
+    def setUp(self):
+        self.account = Account.objects.create(username="student",password="password",email="student@example.com")
+        self.problem = Problem.objects.create(creator=self.account,language="python",title="Problem",description="",solution="print(1)")
+        self.topic = Topic.objects.create(creator=self.account,name="Topic",description="")
+
+    def submit(self,passed_ratio:float,topic:Topic):
+        submission = Submission.objects.create(problem=self.problem,account=self.account,topic=topic,language="python",submission_code="print(1)",is_passed=passed_ratio == 1,passed_ratio=passed_ratio)
+        update_best_submission(submission)
+
+    def test_concurrent_submissions(self):
+        ratios = [random.Random(i).random() for i in range(64)]
+        barrier = threading.Barrier(8)
+        errors = []
+
+        def worker(ratios:list[float]):
+            try:
+                barrier.wait()
+                for ratio in ratios:
+                    self.submit(ratio,self.topic)
+                    self.submit(ratio,None)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker,args=(ratios[i::8],)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors,[])
+        for topic in [self.topic,None]:
+            best_submissions = BestSubmission.objects.filter(problem=self.problem,account=self.account,topic=topic)
+            self.assertEqual(best_submissions.count(),1)
+            self.assertEqual(best_submissions[0].submission.passed_ratio,max(ratios))
+            self.assertEqual(best_submissions[0].passed_ratio,max(ratios))
+
+class GraderTest(TestCase):
+
+    DOUBLE = "print(int(input())*2)"
+
+    def statuses(self,result) -> list[str]:
+        return [res.runtime_status for res in result.data]
+
+    def test_scoring(self):
+        result = PythonGrader(self.DOUBLE,["1","2","3"],1.5).grading(["2\n","5\n","6\n"])
+        self.assertEqual(self.statuses(result),["OK","FAILED","OK"])
+        self.assertEqual(len([res for res in result.data if res.is_passed]),2)
+        self.assertFalse(result.is_passed)
+        self.assertTrue(PythonGrader(self.DOUBLE,["1","2"],1.5).grading(["2\n","4\n"]).is_passed)
+
+    def test_fail_fast(self):
+        called = []
+        result = PythonGrader(self.DOUBLE,["1","2","3"],1.5).grading(["2\n","5\n","6\n"],lambda index,res: called.append((index,res.runtime_status)),fail_fast=True)
+        self.assertEqual(self.statuses(result),["OK","FAILED","SKIPPED"])
+        self.assertEqual(called,[(0,"OK"),(1,"FAILED"),(2,"SKIPPED")])
+        self.assertIsNone(result.data[2].wall_time)
+
+    def test_max_consecutive_timeouts(self):
+        code = "import time\nn = int(input())\nif n: time.sleep(10)\nprint(n)"
+        result = PythonGrader(code,["0","1","0","1","1","0"],0.3).grading(["0\n","1\n","0\n","1\n","1\n","0\n"],max_consecutive_timeouts=2)
+        self.assertEqual(self.statuses(result),["OK","TIMEOUT","OK","TIMEOUT","TIMEOUT","SKIPPED"])
+
+    def test_order_with_concurrency(self):
+        # Later testcases finish first
+        code = "import time\nn = int(input())\ntime.sleep(0.1*(4-n))\nprint(n)"
+        called = []
+        result = PythonGrader(code,["0","1","2","3"],1.5,concurrency=4).grading(["0\n","1\n","2\n","3\n"],lambda index,res: called.append(index))
+        self.assertEqual([res.output for res in result.data],["0\n","1\n","2\n","3\n"])
+        self.assertTrue(result.is_passed)
+        self.assertEqual(called,[0,1,2,3])
+
+    def test_memory_limit(self):
+        result = PythonGrader("x = bytearray(512*1024*1024)\nprint(1)",["0"],1.5,memory_limit=128*1024*1024).grading(["1\n"])
+        self.assertEqual(self.statuses(result),["ERROR"])
+        result = PythonGrader("x = bytearray(16*1024*1024)\nprint(1)",["0"],1.5,memory_limit=128*1024*1024).grading(["1\n"])
+        self.assertEqual(self.statuses(result),["OK"])
+
+    def test_output_limit(self):
+        result = PythonGrader("while True: print('x'*1000)",["0"],1.5,output_limit=100).grading(["x\n"])
+        self.assertEqual(self.statuses(result),["FAILED"])
+        self.assertEqual(result.data[0].output,"x"*100)
+
+    def test_cpu_time_limit(self):
+        # RLIMIT_CPU stops the program before the wall clock timeout
+        code = "import resource\nresource.setrlimit(resource.RLIMIT_CPU,(1,1))\nwhile True: pass"
+        result = PythonGrader(code,["0"],10).grading(["\n"])
+        self.assertEqual(self.statuses(result),["TIMEOUT"])
+        self.assertLess(result.data[0].wall_time,5)
+
+    def test_closed_stdout_still_times_out(self):
+        # No output left to wait for and no CPU used, only the wall clock can stop it
+        code = "import os,time\nos.close(1)\ntime.sleep(20)"
+        for forkserver in [False,True]:
+            with self.settings(GRADER_PYTHON_FORKSERVER=forkserver):
+                result = PythonGrader(code,["0"],0.5).grading(["x"])
+            self.assertEqual(self.statuses(result),["TIMEOUT"])
+            self.assertLess(result.data[0].wall_time,5)
+
+    def test_forkserver_matches_spawn(self):
+        code = "import os,sys\nprint(__name__,os.path.basename(__file__),os.path.dirname(os.path.realpath(__file__)) == os.path.realpath(os.getcwd()),sys.argv == [__file__],sys.path[0] == os.path.dirname(__file__))"
+        expected = "__main__ runner.py True True True\n"
+        for forkserver in [False,True]:
+            with self.settings(GRADER_PYTHON_FORKSERVER=forkserver):
+                result = PythonGrader(code,["0"],1.5).grading([expected])
+            self.assertEqual(result.data[0].output,expected)
+
+class CompileCacheTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def compile_cache(self,timeout:float) -> CompileCache:
+        return CompileCache(self.directory.name,1024*1024,timeout,256*1024*1024,16*1024*1024)
+
+    def test_compile(self):
+        binary = self.compile_cache(10).get_or_compile('c',['gcc'],'c','int main(){return 0;}')
+        self.assertEqual(subprocess.run([binary]).returncode,0)
+
+    def test_memory_limit(self):
+        with self.assertRaises(subprocess.CalledProcessError):
+            self.compile_cache(10).get_or_compile('c',['gcc'],'c','#include "/dev/zero"\nint main(){}')
+
+    def test_timeout(self):
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self.compile_cache(0.05).get_or_compile('cpp',['g++'],'cpp','#include <bits/stdc++.h>\nint main(){}')
+
+class QueueTest(TestCase):
+
+    HOLDER = (
+        "import os,sys,time,fcntl\n"
+        "section = open(sys.argv[1]+'/section1.lock','w')\n"
+        "fcntl.flock(section,fcntl.LOCK_EX)\n"
+        "open(sys.argv[1]+f'/waiting-{os.getpid()}','w').write('3')\n"
+        "print('ready',flush=True)\n"
+        "time.sleep(30)\n"
+    )
+
+    def test_metrics_cover_other_processes(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        queue = Queue(2,directory.name)
+        # Another worker of the node holding section 1 with 3 callers waiting
+        holder = subprocess.Popen([sys.executable,'-c',self.HOLDER,directory.name],stdout=subprocess.PIPE)
+        self.addCleanup(holder.wait)
+        self.addCleanup(holder.kill)
+        self.assertEqual(holder.stdout.readline(),b'ready\n')
+
+        metrics = queue.metrics()
+        self.assertEqual((metrics['busy'],metrics['waiting']),(1,3))
+        with queue.section() as section:
+            self.assertEqual(section,2)
+            self.assertEqual(queue.metrics()['busy'],2)
+
+        holder.kill()
+        holder.wait()
+        holder.stdout.close()
+        metrics = queue.metrics()
+        self.assertEqual((metrics['busy'],metrics['waiting']),(0,0))
+        self.assertFalse(os.path.exists(f'{directory.name}/waiting-{holder.pid}'))
+
+class DifficultyFeaturesTest(TestCase):
+
+    def setUp(self):
+        if import_pandas() is None:
+            self.skipTest("pandas is not installed")
+
+    def test_modelgrader_features(self):
+        start = timezone.now()
+        rows = [
+            # A on p1: fail, fail, pass, then an ignored attempt -> 3 attempts, 100+300 s
+            ('a','p1',False,0),('a','p1',False,100),('a','p1',True,400),('a','p1',False,500),
+            # B on p1: passes at once, the later pass is ignored -> 1 attempt, 0 s
+            ('b','p1',True,1000),('b','p1',True,2000),
+            # C on p1: a gap over MAX_TIME_GAP is capped -> 2 attempts, 10801 s
+            ('c','p1',False,0),('c','p1',True,20000),
+            # A on p2: never passes -> 1 attempt, 0 s
+            ('a','p2',False,0),
+        ]
+        rows = [(account,problem,passed,start+timedelta(seconds=second)) for account,problem,passed,second in rows]
+        # Unsorted input
+        random.Random(0).shuffle(rows)
+        features = modelgrader_features(import_pandas().DataFrame(rows,columns=PREPROCESSOR_COLUMNS))
+
+        self.assertEqual(sorted(features.index),['p1','p2'])
+        self.assertEqual(features.loc['p1','avg_first_passed_total_attempts'],6)
+        self.assertAlmostEqual(features.loc['p1','avg_first_passed_time_used'],(400+0+10801)/3)
+        self.assertEqual(features.loc['p2','avg_first_passed_total_attempts'],1)
+        self.assertEqual(features.loc['p2','avg_first_passed_time_used'],0)
+
+    def test_incremental_statistics_match_modelgrader_features(self):
+        creator = Account.objects.create(username="teacher",password="password",email="teacher@example.com")
+        accounts = [Account.objects.create(username=f"student{i}",password="password",email=f"student{i}@example.com") for i in range(5)]
+        problems = [Problem.objects.create(creator=creator,language="python",title="Problem",description="",solution="print(1)") for i in range(3)]
+        generator = random.Random(1)
+        date = timezone.now()
+        for i in range(120):
+            # Gaps of up to 5 hours, some of them capped
+            date += timedelta(seconds=generator.choice([5,60,600,4000,15000]))
+            submission = Submission.objects.create(problem=generator.choice(problems),account=generator.choice(accounts),language="python",submission_code="print(1)",is_passed=generator.random() < 0.2,date=date)
+            record_first_passed_statistic(submission)
+
+        submission_df = import_pandas().DataFrame.from_records(Submission.objects.values_list(*PREPROCESSOR_COLUMNS),columns=PREPROCESSOR_COLUMNS)
+        features = modelgrader_features(submission_df)
+        for problem in problems:
+            statistic = FirstPassedStatistic.objects.filter(problem=problem).aggregate(total_attempts=Sum('total_attempts'),time_used=Avg('time_used'))
+            self.assertEqual(statistic['total_attempts'],features.loc[problem.problem_id,'avg_first_passed_total_attempts'])
+            self.assertAlmostEqual(statistic['time_used'],features.loc[problem.problem_id,'avg_first_passed_time_used'])
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import account,auth,problem, script,submission,topic,collection,group
+from .views import account,auth,problem, script,submission,topic,collection,group,grader
 
 
 urlpatterns = [
@@ -9,7 +9,7 @@ urlpatterns = [
 
     path("accounts",account.all_accounts_view),
     path("accounts/<str:account_id>",account.one_creator_view),
-    path("accounts/<str:account_id>/daily-submissions",account.get_daily_submission),
+    path("accounts/<str:account_id>/daily-submissions",account.daily_submission_view),
     path("accounts/<str:account_id>/password",account.change_password),
 
     path('accounts/<str:account_id>/problems',problem.all_problems_creator_view),
@@ -25,6 +25,7 @@ urlpatterns = [
     path('accounts/<str:account_id>/topics',topic.all_topics_creator_view),
     path('accounts/<str:account_id>/topics/<str:topic_id>',topic.one_topic_creator_view),
     path('accounts/<str:account_id>/topics/<str:topic_id>/groups',topic.topic_groups_view),
+    path('accounts/<str:account_id>/topics/<str:topic_id>/scoreboard',topic.topic_scoreboard_creator_view),
     
     path('accounts/<str:account_id>/access/topics',topic.all_topics_access_view),
 
@@ -33,6 +34,7 @@ urlpatterns = [
     path('problems',problem.all_problems_view),
     path('problems/validate',problem.validation_view),
     path('problems/<str:problem_id>',problem.one_problem_view),
+    path('problems/<str:problem_id>/runtime-stats',problem.problem_runtime_stats_view),
     path("problems/<str:problem_id>/accounts/<str:account_id>/submissions",submission.account_problem_submission_view),
     path('topics/<str:topic_id>/problems/<str:problem_id>/accounts/<str:account_id>',problem.problem_in_topic_account_view),
 
@@ -49,7 +51,12 @@ urlpatterns = [
     path('groups/<str:group_id>/members/<str:method>',group.group_members_view),
 
     path('submissions',submission.all_submission_view),
+    path('submissions/<str:submission_id>',submission.one_submission_view),
+    path('submissions/<str:submission_id>/stream',submission.submission_stream_view),
+
+    path('grader/queue',grader.grading_queue_view),
 
 
     path('script',script.run_script),
+    path('script/difficulty',script.difficulty_script_view),
 ]
\ No newline at end of file
@@ -10,6 +10,8 @@ from ..serializers import *
 from ..controllers.account.create_account import *
 from ..controllers.account.get_account import *
 from ..controllers.account.get_all_accounts import *
+from ..controllers.account.get_daily_submission import *
+from ..caches.tokens import cache_account_token
 
 @api_view([GET,POST])
 def all_accounts_view(request):
@@ -27,23 +29,10 @@ def change_password(request,account_id):
     account = Account.objects.get(account_id=account_id)
     account.password = passwordEncryption(request.data['password'])
     account.save()
+    cache_account_token(account)
 
     return Response({'message':"Your password has been changed"})
 
 @api_view([GET])
-def get_daily_submission(request,account_id:str):
-    submissions = Submission.objects.filter(account_id=account_id)
-    serializes = SubmissionSerializer(submissions,many=True)
-
-    submission_by_date = {}
-
-    for submission in serializes.data:
-        [date,time] = submission['date'].split("T")
-        if date in submission_by_date:
-            submission_by_date[date]["submissions"].append(submission)
-            submission_by_date[date]["count"] += 1
-        else:
-            submission_by_date[date] = {"count":1, "submissions": [ submission ]}
-    
-    return Response({"submissions_by_date": submission_by_date})
-
+def daily_submission_view(request,account_id:str):
+    return get_daily_submission(account_id,request)
@@ -0,0 +1,9 @@
+from rest_framework.response import Response
+from rest_framework.decorators import api_view
+from ..constant import GET
+from rest_framework import status
+from ..sandbox.queue import grading_queue
+
+@api_view([GET])
+def grading_queue_view(request):
+    return Response(grading_queue.metrics(),status=status.HTTP_200_OK)
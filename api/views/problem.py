@@ -20,6 +20,7 @@ from ..controllers.problem.get_all_problem_with_best_submission import *
 from ..controllers.problem.get_problem_in_topic_with_best_submission import *
 from ..controllers.problem.update_group_permission_to_problem import *
 from ..controllers.problem.get_problem_public import *
+from ..controllers.problem.get_problem_runtime_stats import *
 
 
 # Create your views here.
@@ -48,7 +49,7 @@ def all_problems_view(request):
     except:
         account = None
     if request.method == GET:
-        return get_all_problem_with_best_submission(account)
+        return get_all_problem_with_best_submission(account,request)
     elif request.method == DELETE:
         return remove_bulk_problems(request)
     
@@ -62,6 +63,12 @@ def one_problem_view(request,problem_id: int):
     elif request.method == DELETE:
         return delete_problem(problem_id)
     
+@api_view([GET])
+def problem_runtime_stats_view(request,problem_id:str):
+    problem = Problem.objects.get(problem_id=problem_id)
+    if request.method == GET:
+        return get_problem_runtime_stats(problem)
+
 @api_view([POST])
 def validation_view(request):
     if request.method == POST:
@@ -10,6 +10,7 @@ from ..controllers.script.generate_submission_score import generate_submission_s
 from ..difficulty_predictor.preprocess import *
 from ..difficulty_predictor.predictor import *
 from ..controllers.problem.update_problem_difficulty import update_problem_difficulty
+from ..controllers.script.update_all_problem_difficulties import update_all_problem_difficulties
 
 # @api_view([POST])
 # def run_script(request):
@@ -82,3 +83,7 @@ def run_script(request):
             problem.save()
 
     return Response({'message': 'Success!'},status=status.HTTP_201_CREATED)
+
+@api_view([POST])
+def difficulty_script_view(request):
+    return update_all_problem_difficulties(request)
@@ -1,6 +1,7 @@
 from statistics import mode
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
+from django.views.decorators.http import require_GET
 
 from api.serializers import *
 from ..constant import GET,POST,PUT,DELETE
@@ -17,6 +18,8 @@ from ..controllers.submission.get_submissions_by_account_problem import *
 from ..controllers.submission.submit_problem_on_topic import *
 from ..controllers.submission.get_submissions_by_account_problem_in_topic import *
 from ..controllers.submission.get_all_submissions_by_creator_problem import *
+from ..controllers.submission.get_submission import *
+from ..controllers.submission.stream_submission import *
 
 
 @api_view([POST,GET])
@@ -35,6 +38,17 @@ def creator_problem_submissions_view(request,account_id,problem_id):
 def all_submission_view(request):
     return get_submission_by_quries(request)
 
+@api_view([GET])
+def one_submission_view(request,submission_id:str):
+    submission = Submission.objects.get(submission_id=submission_id)
+    return get_submission(submission)
+
+# Server-sent events are not JSON, so this view bypasses DRF content negotiation.
+@require_GET
+def submission_stream_view(request,submission_id:str):
+    submission = Submission.objects.get(submission_id=submission_id)
+    return stream_submission(submission)
+
 @api_view([POST,GET])
 def topic_account_problem_submission_view(request,topic_id,account_id,problem_id):
     if request.method == POST:
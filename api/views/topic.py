@@ -20,6 +20,7 @@ from ..controllers.topic.update_collections_to_topic import *
 from ..controllers.topic.get_topic_public import *
 from ..controllers.topic.update_groups_permission_to_topic import *
 from ..controllers.topic.get_all_accessed_topics_by_account import *
+from ..controllers.topic.get_topic_scoreboard import *
 from ..permissions.topic import *
 
 @api_view([POST,GET])
@@ -44,6 +45,14 @@ def one_topic_creator_view(request,account_id:str,topic_id:str):
     elif request.method == DELETE:
         return delete_topic(topic)
 
+@api_view([GET])
+def topic_scoreboard_creator_view(request,account_id:str,topic_id:str):
+    topic = Topic.objects.get(topic_id=topic_id)
+    account = Account.objects.get(account_id=account_id)
+    if not canManageTopic(topic,account):
+        return Response(status=status.HTTP_401_UNAUTHORIZED)
+    return get_topic_scoreboard(topic)
+
 @api_view([GET])
 def all_topics_view(request):
     return get_all_topics(request)
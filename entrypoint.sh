@@ -1 +1,2 @@
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
+python manage.py fail_stale_submissions
\ No newline at end of file